@@ -0,0 +1,24 @@
+# Shared building blocks for the graph colouring experiments in part_1.py and part_2.py.
+# Importing this package has no side effects and does not import matplotlib or networkx.
+from graph_colouring.agents import get_nodes_to_visit, run_node_agents, sweep_node_agents
+from graph_colouring.best_coloring import BestColoringRecord
+from graph_colouring.bitset_graph import BitsetGraph
+from graph_colouring.color_histogram import ColorHistogram
+from graph_colouring.color_masks import ForbiddenColorMasks
+from graph_colouring.conflict_tracker import ConflictTracker
+from graph_colouring.csr_graph import CSRGraph
+from graph_colouring.generators import create_random_simple_graph_numpy
+from graph_colouring.graph import (add_edge, add_edges, create_random_simple_graph, flip_edge, flip_edges,
+                                   get_color_conflicts, get_node_color, get_node_neighbours, has_edge,
+                                   rand_initialise_colors, remove_edge, remove_edges, reverse_n_adjacencies,
+                                   reverse_n_random_adjacencies, warm_start_colors)
+from graph_colouring.loaders import load_dimacs_col, load_edge_list, load_graph
+from graph_colouring.metrics import MetricSeries, MetricsRecorder
+from graph_colouring.neighbour_index import GraphNeighbourLists, NeighbourIndex
+from graph_colouring.palette import Palette, make_color_array
+from graph_colouring.palette_search import (bisect_palette_size, greedy_clique_size, greedy_coloring,
+                                            race_palette_sizes, try_palette_size)
+from graph_colouring.progress import ProgressReporter
+from graph_colouring.random_source import RandomSource, as_numpy_generator, as_random_source
+from graph_colouring.runner import run_experiment, run_experiment_grid
+from graph_colouring.vectorized_sweep import VectorizedSweepEngine
@@ -0,0 +1,92 @@
+from graph_colouring.color_masks import ForbiddenColorMasks
+from graph_colouring.conflict_tracker import ConflictTracker
+from graph_colouring.random_source import as_random_source
+from graph_colouring.vectorized_sweep import VectorizedSweepEngine
+
+# Which node agents are visited in one sweep (one iteration over node agents):
+# - "all_nodes": every node, in index order
+# - "conflicted_nodes": only the nodes in conflict at the start of the sweep, in index order. Nodes that are
+#   not in conflict never act, so this only skips work, except that a node pulled into conflict part way
+#   through a sweep waits until the next sweep to act
+# run_node_agents also accepts "vectorized" (see VectorizedSweepEngine)
+sweep_modes = ("all_nodes", "conflicted_nodes")
+
+
+# Returns the nodes that node agents loop over in the next sweep for the given sweep_mode
+def get_nodes_to_visit(sweep_mode, num_nodes, forbidden_color_masks):
+    if sweep_mode == "all_nodes":
+        return range(num_nodes)
+
+    if sweep_mode == "conflicted_nodes":
+        return sorted(forbidden_color_masks.conflicted_nodes)
+
+    raise ValueError(f"Unknown sweep mode '{sweep_mode}', expected one of {sweep_modes}")
+
+
+# Loops over the given node agents once. num_colors_available is the number of colors (from the start
+# of the palette) that the agents may currently use. The random numbers for the agents' decisions are drawn
+# from rng (see rand_initialise_colors), one per node in conflict: in one batch for the nodes in conflict at the
+# start of the sweep, then one at a time for any more that are pulled into conflict during it
+def sweep_node_agents(nodes, forbidden_color_masks, conflict_tracker, num_colors_available,
+                      prob_of_node_changing_color, rng=None):
+    random_source = as_random_source(rng)
+    draws = random_source.random_batch(len(forbidden_color_masks.conflicted_nodes))
+
+    # If it conflicts with its neighbours' colorings, node will autonomously
+    # decide if it will change color and, if so, which color it will pick
+    for node in nodes:
+        # If the current node shares a color with any neighbour, it is in conflict
+        # (its color's bit is set in the mask of colors used by its neighbours)
+        if forbidden_color_masks.is_in_conflict(node):
+            draw = draws.pop() if draws else random_source.random()
+
+            # If true, node will decide to change its color such that it is
+            # different from all its neighbours
+            if draw < prob_of_node_changing_color:
+                # Node must choose a color from the list of available colors
+                # that is not used by any of its neighbours.
+                # It will attempt to choose colors closer to the start of
+                # colors_list (the lowest free color index). This decision strategy
+                # should constrain the total number of distinct colors used in the graph
+                color = forbidden_color_masks.get_first_free_color(node, num_colors_available)
+                if color is not None:
+                    # Node assigns itself the new color to resolve conflicts with neighbours
+                    conflict_tracker.set_node_color(node, color)
+
+                # The node could still have its old color here if it ran out of new colors to choose
+                # from in colors_list i.e., there were no more distinct colors left to switch
+                # to in order to resolve conflicts with neighbours. In this case, the node will simply retain its
+                # current color for this iteration.
+
+
+# Repeatedly loops over the node agents (sweeps) until colors has no conflicts, max_iterations sweeps have been
+# done or should_stop() (if given) returns True. colors is updated in place and must only use color indices below
+# num_colors_available. sweep_mode may also be "vectorized", in which case adj_matrix must be a CSRGraph and
+# neighbour_index isn't used (it may be None).
+# The agents' decisions are drawn from rng (see rand_initialise_colors).
+# Returns the number of conflicts left and the number of sweeps done
+def run_node_agents(adj_matrix, neighbour_index, colors, num_colors_available, prob_of_node_changing_color,
+                    max_iterations, sweep_mode="all_nodes", should_stop=None, rng=None):
+    random_source = as_random_source(rng)
+
+    if sweep_mode == "vectorized":
+        conflict_tracker = VectorizedSweepEngine(adj_matrix, colors, random_source)
+    else:
+        forbidden_color_masks = ForbiddenColorMasks(neighbour_index, colors, num_colors_available)
+        conflict_tracker = ConflictTracker(neighbour_index, colors, forbidden_color_masks)
+
+    iteration = 0
+    while conflict_tracker.conflicts != 0 and iteration < max_iterations:
+        if should_stop is not None and should_stop():
+            break
+
+        iteration += 1
+
+        if sweep_mode == "vectorized":
+            conflict_tracker.sweep(num_colors_available, prob_of_node_changing_color)
+        else:
+            nodes_to_visit = get_nodes_to_visit(sweep_mode, len(neighbour_index), forbidden_color_masks)
+            sweep_node_agents(nodes_to_visit, forbidden_color_masks, conflict_tracker, num_colors_available,
+                              prob_of_node_changing_color, random_source)
+
+    return conflict_tracker.conflicts, iteration
@@ -0,0 +1,55 @@
+from graph_colouring.palette import make_color_array
+
+
+# Record of the best valid coloring found so far, stamped with the version of the graph (see
+# NeighbourIndex.version) it was last validated against. It listens for edge flips on the neighbour index and
+# keeps those made since then, so checking whether it is still valid only looks at those edges, instead of
+# recounting the conflicts of the whole coloring, and nothing at all while the version is unchanged.
+class BestColoringRecord:
+    def __init__(self, neighbour_index):
+        self.neighbour_index = neighbour_index
+        self.clear()
+
+        neighbour_index.add_edge_listener(self)
+
+    # Forgets the recorded coloring (the node agents no longer have a solution)
+    def clear(self):
+        self.coloring = None
+        self.num_colors = None
+        self.conflicts = 0
+        self.validated_version = None
+        # (node_1, node_2, edge_added) flips made since the coloring was last validated
+        self.pending_edge_changes = []
+
+    def has_coloring(self):
+        return self.coloring is not None
+
+    # Records a copy of colors, which must currently have zero conflicts. num_colors is the number of distinct
+    # colors it uses, if already known (e.g., from a ColorHistogram)
+    def set_coloring(self, colors, num_colors=None):
+        self.coloring = make_color_array(colors)
+        self.num_colors = len(set(colors)) if num_colors is None else num_colors
+        self.conflicts = 0
+        self.validated_version = self.neighbour_index.version
+        self.pending_edge_changes = []
+
+    # Keeps the flip until the coloring is next validated (flips don't matter while there is no coloring)
+    def edge_flipped(self, node_1, node_2, edge_added):
+        if self.coloring is not None:
+            self.pending_edge_changes.append((node_1, node_2, edge_added))
+
+    # True if there is a recorded coloring and it has no conflicts on the current graph
+    def is_valid(self):
+        if self.coloring is None:
+            return False
+
+        # Only the edges flipped since the last validation can have changed the coloring's conflicts
+        if self.validated_version != self.neighbour_index.version:
+            for node_1, node_2, edge_added in self.pending_edge_changes:
+                if self.coloring[node_1] == self.coloring[node_2]:
+                    self.conflicts += 1 if edge_added else -1
+
+            self.pending_edge_changes = []
+            self.validated_version = self.neighbour_index.version
+
+        return self.conflicts == 0
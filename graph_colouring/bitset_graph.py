@@ -0,0 +1,188 @@
+import numpy as np
+
+# Bits per word of the bitset
+word_bits = 64
+
+# Upper limit on the number of words combined in one go when counting conflicts, so that the temporary arrays
+# stay small (about 24 bytes per word) for very large graphs
+max_words_per_block = 2 ** 20
+
+# Number of set bits in every byte value, for NumPy versions without bitwise_count (added in NumPy 2.0)
+byte_popcounts = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1)
+
+
+# Returns the total number of set bits in an array of uint64 words
+def popcount(words):
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+
+    return int(byte_popcounts[np.ascontiguousarray(words).view(np.uint8)].sum(dtype=np.int64))
+
+
+# Returns the bits of an array of words as an array of 0/1 bytes, bit b of word w at position w * 64 + b
+def unpack_word_bits(words):
+    return np.unpackbits(words.astype("<u8", copy=False).view(np.uint8), bitorder="little")
+
+
+# Bit-packed representation of a simple undirected graph for the dense regime: one bit per unordered pair of
+# nodes, packed into uint64 words, about num_nodes^2 / 16 bytes in total instead of the full Python int per entry
+# (stored twice) of a list-of-lists adjacency matrix.
+# Only the upper triangle is stored: row node holds the bits of the pairs (node, other_node) with other_node > node.
+# Each row starts on a word boundary and its words line up with the columns of the full matrix (word w holds
+# columns w * 64 to w * 64 + 63), starting from the word holding column node + 1, so a row can be combined with
+# any other per-node bitset word for word. As each pair has a single bit, the graph is always symmetric.
+class BitsetGraph:
+    def __init__(self, num_nodes):
+        self.num_nodes = num_nodes
+        self.num_column_words = (num_nodes + word_bits - 1) // word_bits
+
+        # Row node covers column words first_words[node] to num_column_words - 1, held in
+        # words[word_offsets[node]:word_offsets[node + 1]]
+        self.first_words = np.arange(1, num_nodes + 1, dtype=np.int64) // word_bits
+        self.word_offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(self.num_column_words - self.first_words, out=self.word_offsets[1:])
+
+        self.words = np.zeros(self.word_offsets[-1], dtype=np.uint64)
+
+    # Builds a graph from two equal length arrays of node pairs, one pair per undirected edge.
+    # Pairs must not be self-edges (this is a simple graph)
+    @classmethod
+    def from_edges(cls, num_nodes, node_1s, node_2s):
+        graph = cls(num_nodes)
+        word_positions, bits = graph.get_bit_positions(node_1s, node_2s)
+        np.bitwise_or.at(graph.words, word_positions, bits)
+
+        return graph
+
+    # Builds a graph from a list-of-lists or NumPy adjacency matrix. Only the lower triangle is read,
+    # matching the half of the matrix that get_color_conflicts and reverse_n_adjacencies use
+    @classmethod
+    def from_adj_matrix(cls, adj_matrix):
+        node_1s, node_2s = np.nonzero(np.tril(np.asarray(adj_matrix, dtype=np.uint8), k=-1))
+
+        return cls.from_edges(len(adj_matrix), node_1s, node_2s)
+
+    # Number of nodes, so that len(graph) can be used wherever len(adj_matrix) was used
+    def __len__(self):
+        return self.num_nodes
+
+    @property
+    def num_edges(self):
+        return popcount(self.words)
+
+    # Returns the positions in words of the bits for the given pairs of nodes (arrays or single nodes)
+    # and the bits themselves, as uint64 words with only that bit set
+    def get_bit_positions(self, node_1s, node_2s):
+        node_1s = np.asarray(node_1s, dtype=np.int64)
+        node_2s = np.asarray(node_2s, dtype=np.int64)
+        rows = np.minimum(node_1s, node_2s)
+        columns = np.maximum(node_1s, node_2s)
+
+        word_positions = self.word_offsets[rows] + columns // word_bits - self.first_words[rows]
+        bits = np.left_shift(np.uint64(1), (columns % word_bits).astype(np.uint64))
+
+        return word_positions, bits
+
+    def has_edge(self, node_1, node_2):
+        if node_1 == node_2:
+            return False
+
+        word_position, bit = self.get_bit_positions(node_1, node_2)
+
+        return bool(self.words[word_position] & bit)
+
+    # Returns the (sorted) neighbours of a node as an array. Neighbours below node are found by testing the bit
+    # for node in the rows of every lower node, those above node by unpacking node's own row
+    def neighbours(self, node):
+        lower_nodes = np.arange(node, dtype=np.int64)
+        word_positions, bits = self.get_bit_positions(lower_nodes, np.full(node, node, dtype=np.int64))
+        lower_neighbours = lower_nodes[(self.words[word_positions] & bits) != 0]
+
+        row_words = self.words[self.word_offsets[node]:self.word_offsets[node + 1]]
+        row_bits = unpack_word_bits(row_words)
+        upper_neighbours = np.flatnonzero(row_bits) + self.first_words[node] * word_bits
+
+        return np.concatenate([lower_neighbours, upper_neighbours])
+
+    def degree(self, node):
+        return len(self.neighbours(node))
+
+    # Returns the degree of every node as an array, counted from the end nodes of every edge
+    def degrees(self):
+        node_1s, node_2s = self.edges()
+
+        return np.bincount(node_1s, minlength=self.num_nodes) + np.bincount(node_2s, minlength=self.num_nodes)
+
+    # Returns every edge once as two arrays (node_1s, node_2s) with node_1 > node_2,
+    # i.e., the lower triangle of the equivalent adjacency matrix
+    def edges(self):
+        nonzero_word_positions = np.flatnonzero(self.words)
+        word_bit_matrix = unpack_word_bits(self.words[nonzero_word_positions]).reshape(-1, word_bits)
+        word_numbers, bit_numbers = np.nonzero(word_bit_matrix)
+
+        word_positions = nonzero_word_positions[word_numbers]
+        rows = np.searchsorted(self.word_offsets, word_positions, side="right") - 1
+        columns = (word_positions - self.word_offsets[rows] + self.first_words[rows]) * word_bits + bit_numbers
+
+        return columns, rows
+
+    # Returns one bitset per color class, as a num_colors x num_column_words array of words: bit node of row color
+    # is set if node has that color
+    def get_color_class_words(self, colors):
+        num_colors = int(colors.max()) + 1 if len(colors) else 0
+        in_class = np.zeros((num_colors, self.num_column_words * word_bits), dtype=bool)
+        in_class[colors, np.arange(self.num_nodes)] = True
+
+        return np.packbits(in_class, axis=1, bitorder="little").view("<u8").astype(np.uint64)
+
+    # Returns the number of edges whose two end nodes share a color, without comparing colors pair by pair:
+    # the conflicts of a node with the nodes above it are the set bits of its row ANDed with the bitset of its
+    # own color class, which covers 64 pairs of nodes per word. Every edge is in exactly one row, so these sum
+    # to the number of conflicts. Rows are combined in blocks of whole rows with NumPy array operations
+    def count_conflicts(self, colors):
+        colors = np.asarray(colors, dtype=np.int64)
+        color_class_words = self.get_color_class_words(colors)
+        row_lengths = np.diff(self.word_offsets)
+
+        conflicts = 0
+        first_row = 0
+        while first_row < self.num_nodes:
+            block_end = self.word_offsets[first_row] + max_words_per_block
+            last_row = int(np.searchsorted(self.word_offsets, block_end, side="right")) - 1
+            last_row = min(max(last_row, first_row + 1), self.num_nodes)
+
+            # The row and the column word of every word in the block
+            rows = np.repeat(np.arange(first_row, last_row), row_lengths[first_row:last_row])
+            word_positions = np.arange(self.word_offsets[first_row], self.word_offsets[last_row])
+            column_words = word_positions - self.word_offsets[rows] + self.first_words[rows]
+
+            conflicts += popcount(self.words[word_positions] & color_class_words[colors[rows], column_words])
+            first_row = last_row
+
+        return conflicts
+
+    # Removes the edge between node_1 and node_2 if it exists, otherwise adds it, in O(1).
+    # Returns True if the edge was added and False if it was removed
+    def flip_edge(self, node_1, node_2):
+        word_position, bit = self.get_bit_positions(node_1, node_2)
+        self.words[word_position] ^= bit
+
+        return bool(self.words[word_position] & bit)
+
+    # Flips every given node pair. A pair that appears an even number of times is left unchanged
+    def flip_edges(self, pairs):
+        if len(pairs) == 0:
+            return
+
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        word_positions, bits = self.get_bit_positions(pairs[:, 0], pairs[:, 1])
+        np.bitwise_xor.at(self.words, word_positions, bits)
+
+    # Converts back to a (symmetric) list-of-lists adjacency matrix
+    def to_adj_matrix(self):
+        adj_matrix = np.zeros((self.num_nodes, self.num_nodes), dtype=np.uint8)
+        node_1s, node_2s = self.edges()
+        adj_matrix[node_1s, node_2s] = 1
+        adj_matrix[node_2s, node_1s] = 1
+
+        return adj_matrix.tolist()
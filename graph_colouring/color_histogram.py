@@ -0,0 +1,51 @@
+import numpy as np
+
+
+# Keeps, for every color index, the number of nodes that currently have that color, so the number of distinct
+# colors in use is always available in O(1) instead of with len(set(colors)) (O(num_nodes) and a new set).
+# Counted once when created and then updated whenever a node changes color.
+class ColorHistogram:
+    def __init__(self, colors, num_colors=0):
+        counts = np.bincount(np.asarray(colors, dtype=np.int64), minlength=num_colors)
+
+        # counts[color] is the number of nodes with that color
+        self.counts = counts.tolist()
+        self.num_colors_used = int(np.count_nonzero(counts))
+
+    def get_color_count(self, color):
+        return self.counts[color] if color < len(self.counts) else 0
+
+    # Moves node from old_color's class to new_color's class
+    def node_color_changed(self, node, old_color, new_color):
+        if new_color >= len(self.counts):
+            self.counts.extend([0] * (new_color + 1 - len(self.counts)))
+
+        self.counts[old_color] -= 1
+        if self.counts[old_color] == 0:
+            self.num_colors_used -= 1
+
+        self.counts[new_color] += 1
+        if self.counts[new_color] == 1:
+            self.num_colors_used += 1
+
+    # Batch version of node_color_changed for many nodes at once, given NumPy arrays of
+    # their old and new colors (e.g., every node that changed color in a VectorizedSweepEngine sweep)
+    def colors_changed(self, old_colors, new_colors):
+        if len(old_colors) == 0:
+            return
+
+        num_colors = max(len(self.counts), int(old_colors.max()) + 1, int(new_colors.max()) + 1)
+        counts = np.zeros(num_colors, dtype=np.int64)
+        counts[:len(self.counts)] = self.counts
+        counts -= np.bincount(old_colors, minlength=num_colors)
+        counts += np.bincount(new_colors, minlength=num_colors)
+
+        self.counts = counts.tolist()
+        self.num_colors_used = int(np.count_nonzero(counts))
+
+    # Returns the color used by the fewest nodes (but at least one), or None if no node has a color.
+    # Its nodes are the fewest that would need recoloring to stop using a color altogether
+    def get_smallest_color_class(self):
+        used_colors = [color for color, count in enumerate(self.counts) if count > 0]
+
+        return min(used_colors, key=lambda color: self.counts[color]) if used_colors else None
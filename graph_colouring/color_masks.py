@@ -0,0 +1,116 @@
+from array import array
+
+import numpy as np
+
+
+# For every node, keeps a bitmask of the colors currently used by its neighbours (bit c is set if
+# at least one neighbour has color index c). A node is in conflict if the bit of its own color is
+# set, and the first color it can switch to is the lowest unset bit. The masks are kept up to date
+# incrementally as nodes change color or edges are flipped, using a count of neighbours per color.
+# The set of nodes currently in conflict is maintained alongside the masks.
+class ForbiddenColorMasks:
+    # num_colors is the total number of color indices that can appear in colors (e.g., len(palette)).
+    # The counts of all nodes are held in one flat array, so an index outside of that range is rejected rather
+    # than being counted against another node
+    def __init__(self, neighbour_index, colors, num_colors):
+        if len(colors) > 0 and (min(colors) < 0 or max(colors) >= num_colors):
+            raise ValueError(f"Coloring uses color indices outside of 0 to {num_colors - 1}")
+
+        self.neighbour_index = neighbour_index
+        self.colors = colors
+        self.num_colors = num_colors
+
+        # neighbour_color_counts[node * num_colors + color] is the number of neighbours of node with that color
+        self.neighbour_color_counts = array("I", bytes(4 * len(neighbour_index) * num_colors))
+        self.masks = [0] * len(neighbour_index)
+
+        if neighbour_index.graph is not None:
+            self.count_neighbour_colors_of_graph(neighbour_index.graph)
+        else:
+            for node, neighbours in enumerate(neighbour_index.neighbours):
+                for neighbour in neighbours:
+                    self.neighbour_color_counts[node * num_colors + colors[neighbour]] += 1
+                    self.masks[node] |= 1 << colors[neighbour]
+
+        self.conflicted_nodes = {node for node in range(len(neighbour_index)) if self.is_in_conflict(node)}
+
+    # Fills in the counts and masks from the edge arrays of a CSRGraph or BitsetGraph with NumPy, rather than
+    # looking up the neighbours of every node one at a time
+    def count_neighbour_colors_of_graph(self, graph):
+        num_nodes = len(graph)
+        colors = np.frombuffer(self.colors, dtype=np.uint8) if isinstance(self.colors, array) else self.colors
+
+        # Every edge counts the color of each end node for the other end node
+        node_1s, node_2s = graph.edges()
+        positions = np.concatenate([node_1s.astype(np.int64) * self.num_colors + colors[node_2s],
+                                    node_2s.astype(np.int64) * self.num_colors + colors[node_1s]])
+        counts = np.bincount(positions, minlength=num_nodes * self.num_colors).astype(np.uint32)
+        self.neighbour_color_counts = array("I", counts.tobytes())
+
+        for node, color in zip(*np.nonzero(counts.reshape(num_nodes, self.num_colors))):
+            self.masks[node] |= 1 << int(color)
+
+    # Raises a ValueError if color can't be counted in the masks
+    def check_color(self, color):
+        if not 0 <= color < self.num_colors:
+            raise ValueError(f"Color index {color} is outside of 0 to {self.num_colors - 1}")
+
+    # True if any neighbour of node shares its color
+    def is_in_conflict(self, node):
+        return (self.masks[node] >> self.colors[node]) & 1 == 1
+
+    # Returns the lowest color index below num_colors_available that none of node's
+    # neighbours use, or None if every one of those colors is used by a neighbour
+    def get_first_free_color(self, node, num_colors_available):
+        mask = self.masks[node]
+        # Isolate the lowest zero bit of the mask
+        first_free_color = ((~mask) & (mask + 1)).bit_length() - 1
+
+        return first_free_color if first_free_color < num_colors_available else None
+
+    # Records that one fewer neighbour of node has the given color
+    def remove_neighbour_color(self, node, color):
+        position = node * self.num_colors + color
+        self.neighbour_color_counts[position] -= 1
+
+        if self.neighbour_color_counts[position] == 0:
+            self.masks[node] &= ~(1 << color)
+
+            # Last neighbour sharing node's color has gone
+            if color == self.colors[node]:
+                self.conflicted_nodes.discard(node)
+
+    # Records that one more neighbour of node has the given color
+    def add_neighbour_color(self, node, color):
+        position = node * self.num_colors + color
+        self.neighbour_color_counts[position] += 1
+
+        if self.neighbour_color_counts[position] == 1:
+            self.masks[node] |= 1 << color
+
+            # First neighbour sharing node's color has arrived
+            if color == self.colors[node]:
+                self.conflicted_nodes.add(node)
+
+    # Updates the masks of node's neighbours after node changed color from old_color to new_color
+    # (colors[node] must already hold new_color)
+    def node_color_changed(self, node, old_color, new_color):
+        self.check_color(new_color)
+
+        for neighbour in self.neighbour_index.neighbours[node]:
+            self.remove_neighbour_color(neighbour, old_color)
+            self.add_neighbour_color(neighbour, new_color)
+
+        if self.is_in_conflict(node):
+            self.conflicted_nodes.add(node)
+        else:
+            self.conflicted_nodes.discard(node)
+
+    # Updates the masks of both nodes after the edge between them was added or removed
+    def edge_flipped(self, node_1, node_2, edge_added):
+        if edge_added:
+            self.add_neighbour_color(node_1, self.colors[node_2])
+            self.add_neighbour_color(node_2, self.colors[node_1])
+        else:
+            self.remove_neighbour_color(node_1, self.colors[node_2])
+            self.remove_neighbour_color(node_2, self.colors[node_1])
@@ -0,0 +1,62 @@
+from graph_colouring.color_histogram import ColorHistogram
+
+
+# Keeps a running count of the color conflicts in a graph so that the count does not
+# need to be recomputed with a full scan of the adjacency matrix every time it is needed.
+# The count is computed once when the tracker is created and is then updated in O(degree)
+# whenever a node changes color or an edge between two nodes is added/removed.
+# Also keeps a ColorHistogram of the coloring (color_histogram), for the number of distinct colors in use.
+class ConflictTracker:
+    # neighbour_index is the NeighbourIndex of the graph being colored. If forbidden_color_masks
+    # (a ForbiddenColorMasks built on the same coloring) is given, it is kept up to date as well
+    def __init__(self, neighbour_index, colors, forbidden_color_masks=None):
+        self.neighbour_index = neighbour_index
+        self.forbidden_color_masks = forbidden_color_masks
+
+        # The coloring being tracked. It is updated in place by set_node_color
+        self.colors = colors
+
+        self.color_histogram = ColorHistogram(colors)
+
+        self.conflicts = neighbour_index.count_conflicts(colors)
+
+    # Returns the number of neighbours that currently share node's color
+    def get_node_conflicts(self, node):
+        node_color = self.colors[node]
+
+        return sum(1 for neighbour in self.neighbour_index.neighbours[node] if self.colors[neighbour] == node_color)
+
+    # Assigns a new color to node and adjusts the conflict count by looking only at its neighbours
+    def set_node_color(self, node, color):
+        old_color = self.colors[node]
+
+        if color == old_color:
+            return
+
+        # Checked before anything is updated, so a rejected color leaves the tracker unchanged
+        if self.forbidden_color_masks is not None:
+            self.forbidden_color_masks.check_color(color)
+
+        for neighbour in self.neighbour_index.neighbours[node]:
+            neighbour_color = self.colors[neighbour]
+            # Conflict with this neighbour is resolved by the color change
+            if neighbour_color == old_color:
+                self.conflicts -= 1
+            # Conflict with this neighbour is introduced by the color change
+            elif neighbour_color == color:
+                self.conflicts += 1
+
+        self.colors[node] = color
+        self.color_histogram.node_color_changed(node, old_color, color)
+
+        if self.forbidden_color_masks is not None:
+            self.forbidden_color_masks.node_color_changed(node, old_color, color)
+
+    # Adjusts the conflict count after the edge between node_1 and node_2 has been
+    # added (edge_added is True) or removed (edge_added is False) from the graph
+    def edge_flipped(self, node_1, node_2, edge_added):
+        if self.colors[node_1] == self.colors[node_2]:
+            self.conflicts += 1 if edge_added else -1
+
+        if self.forbidden_color_masks is not None:
+            self.forbidden_color_masks.edge_flipped(node_1, node_2, edge_added)
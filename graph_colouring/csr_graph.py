@@ -0,0 +1,117 @@
+import numpy as np
+
+
+# Compressed sparse row (CSR) representation of a simple undirected graph. The (sorted)
+# neighbours of a node are stored in indices[indptr[node]:indptr[node + 1]], so memory is
+# O(num_nodes + num_edges) rather than the O(num_nodes^2) of a full adjacency matrix.
+# Every edge is stored in both directions so that neighbour lookups see the whole graph.
+class CSRGraph:
+    def __init__(self, indptr, indices):
+        self.indptr = indptr
+        self.indices = indices
+
+    # Builds a graph from two equal length arrays of node pairs, one pair per undirected edge.
+    # Pairs must be distinct and must not be self-edges (this is a simple graph)
+    @classmethod
+    def from_edges(cls, num_nodes, node_1s, node_2s):
+        node_1s = np.asarray(node_1s, dtype=np.int64)
+        node_2s = np.asarray(node_2s, dtype=np.int64)
+
+        # Store each edge in both directions, then sort by (row, column), encoded as a single integer key
+        # (sorting one key is much faster than a lexsort of two)
+        rows = np.concatenate([node_1s, node_2s])
+        keys = np.sort(rows * num_nodes + np.concatenate([node_2s, node_1s]))
+
+        index_dtype = np.int32 if num_nodes < 2 ** 31 else np.int64
+        indices = (keys % num_nodes).astype(index_dtype)
+
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=num_nodes), out=indptr[1:])
+
+        return cls(indptr, indices)
+
+    # Builds a graph from a list-of-lists adjacency matrix. Only the lower triangle is read,
+    # matching the half of the matrix that get_color_conflicts and reverse_n_adjacencies use
+    @classmethod
+    def from_adj_matrix(cls, adj_matrix):
+        node_1s, node_2s = np.nonzero(np.tril(np.array(adj_matrix, dtype=np.uint8), k=-1))
+
+        return cls.from_edges(len(adj_matrix), node_1s, node_2s)
+
+    # Number of nodes, so that len(graph) can be used wherever len(adj_matrix) was used
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices) // 2
+
+    # Returns the (sorted) neighbours of a node as a read-only view into indices
+    def neighbours(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def degree(self, node):
+        return int(self.indptr[node + 1] - self.indptr[node])
+
+    # Returns the degree of every node as an array
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    # Binary search of node_1's (sorted) neighbours for node_2
+    def has_edge(self, node_1, node_2):
+        neighbours = self.neighbours(node_1)
+        position = np.searchsorted(neighbours, node_2)
+
+        return position < len(neighbours) and neighbours[position] == node_2
+
+    # Returns every edge once as two arrays (node_1s, node_2s) with node_1 > node_2,
+    # i.e., the lower triangle of the equivalent adjacency matrix
+    def edges(self):
+        rows = np.repeat(np.arange(len(self), dtype=self.indices.dtype), np.diff(self.indptr))
+        lower_triangle = self.indices < rows
+
+        return rows[lower_triangle], self.indices[lower_triangle]
+
+    # Returns the number of edges whose two end nodes share a color
+    def count_conflicts(self, colors):
+        colors = np.asarray(colors)
+        node_1s, node_2s = self.edges()
+
+        return int(np.count_nonzero(colors[node_1s] == colors[node_2s]))
+
+    # Removes the edge between node_1 and node_2 if it exists, otherwise adds it
+    def flip_edge(self, node_1, node_2):
+        self.flip_edges([(node_1, node_2)])
+
+    # Flips every given node pair in one rebuild of the CSR arrays, which costs O(num_edges)
+    # regardless of how many pairs are flipped, so flips should be batched where possible.
+    # A pair that appears an even number of times is left unchanged
+    def flip_edges(self, pairs):
+        num_nodes = len(self)
+
+        if len(pairs) == 0:
+            return
+
+        # Encode each undirected pair as a single integer key (larger node first)
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        flip_keys = pairs.max(axis=1) * num_nodes + pairs.min(axis=1)
+        flip_keys, counts = np.unique(flip_keys, return_counts=True)
+        flip_keys = flip_keys[counts % 2 == 1]
+
+        node_1s, node_2s = self.edges()
+        edge_keys = node_1s.astype(np.int64) * num_nodes + node_2s
+
+        new_keys = np.setxor1d(edge_keys, flip_keys, assume_unique=True)
+        rebuilt = CSRGraph.from_edges(num_nodes, new_keys // num_nodes, new_keys % num_nodes)
+
+        self.indptr = rebuilt.indptr
+        self.indices = rebuilt.indices
+
+    # Converts back to a (symmetric) list-of-lists adjacency matrix
+    def to_adj_matrix(self):
+        adj_matrix = np.zeros((len(self), len(self)), dtype=np.uint8)
+        node_1s, node_2s = self.edges()
+        adj_matrix[node_1s, node_2s] = 1
+        adj_matrix[node_2s, node_1s] = 1
+
+        return adj_matrix.tolist()
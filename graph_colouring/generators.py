@@ -0,0 +1,142 @@
+import numpy as np
+
+from graph_colouring.bitset_graph import BitsetGraph
+from graph_colouring.csr_graph import CSRGraph
+from graph_colouring.random_source import as_numpy_generator
+
+
+# Upper limit on the number of node pairs drawn in a single call to the random number generator,
+# so that memory stays bounded (about 8 bytes per pair) for very large graphs
+max_pairs_per_draw = 2 ** 24
+
+
+# Vectorized version of create_random_simple_graph (based on Erdos-Renyi random graph model).
+# Each of the num_nodes * (num_nodes - 1) / 2 node pairs gets an edge independently with probability
+# prob_of_creating_edge_between_two_nodes, drawn from a numpy Generator rather than with one call to
+# random.random() per pair.
+# seed may be an int, None, an existing numpy Generator, a random.Random or a RandomSource.
+# method chooses how edges are sampled:
+# - "all_pairs": draw a random number for every node pair, O(num_nodes^2)
+# - "geometric_skip": draw only the gaps between consecutive edges, O(num_edges). Much faster for sparse graphs
+# output chooses what is returned:
+# - "dense": symmetric num_nodes x num_nodes NumPy adjacency matrix of the given dtype (uint8 or bool)
+# - "edges": (node_1s, node_2s) arrays holding every edge once, with node_1 > node_2
+# - "csr": CSRGraph
+# - "bitset": BitsetGraph
+def create_random_simple_graph_numpy(num_nodes, prob_of_creating_edge_between_two_nodes, seed=None,
+                                     output="dense", dtype=np.uint8, method="all_pairs"):
+    if output not in ("dense", "edges", "csr", "bitset"):
+        raise ValueError(f"Unknown output '{output}', expected 'dense', 'edges', 'csr' or 'bitset'")
+
+    rng = as_numpy_generator(seed)
+
+    if method == "all_pairs":
+        node_1s, node_2s = sample_edges_all_pairs(num_nodes, prob_of_creating_edge_between_two_nodes, rng)
+    elif method == "geometric_skip":
+        node_1s, node_2s = sample_edges_geometric_skip(num_nodes, prob_of_creating_edge_between_two_nodes, rng)
+    else:
+        raise ValueError(f"Unknown method '{method}', expected 'all_pairs' or 'geometric_skip'")
+
+    if output == "edges":
+        return node_1s, node_2s
+
+    if output == "csr":
+        return CSRGraph.from_edges(num_nodes, node_1s, node_2s)
+
+    if output == "bitset":
+        return BitsetGraph.from_edges(num_nodes, node_1s, node_2s)
+
+    adj_matrix = np.zeros((num_nodes, num_nodes), dtype=dtype)
+    adj_matrix[node_1s, node_2s] = 1
+    adj_matrix[node_2s, node_1s] = 1
+
+    return adj_matrix
+
+
+# Draws a random number for every lower triangle node pair, in blocks of whole rows,
+# and returns the (node_1s, node_2s) arrays of the pairs that became edges
+def sample_edges_all_pairs(num_nodes, prob_of_creating_edge_between_two_nodes, rng):
+    node_1_blocks = []
+    node_2_blocks = []
+
+    # Row node_1 of the lower triangle holds the node_1 pairs (node_1, 0) ... (node_1, node_1 - 1)
+    first_row = 1
+    while first_row < num_nodes:
+        # Take as many whole rows as fit in max_pairs_per_draw (always at least one row)
+        last_row = first_row + 1
+        while last_row < num_nodes and pairs_in_rows(first_row, last_row + 1) <= max_pairs_per_draw:
+            last_row += 1
+
+        is_edge = rng.random(pairs_in_rows(first_row, last_row)) < prob_of_creating_edge_between_two_nodes
+        flat_positions = np.flatnonzero(is_edge)
+
+        # Map each position in the block back to its (row, column) in the lower triangle
+        rows = np.arange(first_row, last_row, dtype=np.int64)
+        row_offsets = rows * (rows - 1) // 2 - first_row * (first_row - 1) // 2
+        row_of_position = np.searchsorted(row_offsets, flat_positions, side="right") - 1
+
+        node_1_blocks.append(rows[row_of_position])
+        node_2_blocks.append(flat_positions - row_offsets[row_of_position])
+
+        first_row = last_row
+
+    return concatenate_edge_blocks(node_1_blocks, node_2_blocks)
+
+
+# Geometric skipping sampler (Batagelj and Brandes, 2005). Lays the lower triangle node pairs out in a single
+# row by row sequence and, instead of testing each pair, draws the number of pairs skipped until the next
+# edge from a geometric distribution. Only the edges are ever generated, so the cost is O(num_edges).
+# Returns the (node_1s, node_2s) arrays of the edges
+def sample_edges_geometric_skip(num_nodes, prob_of_creating_edge_between_two_nodes, rng):
+    total_pairs = num_nodes * (num_nodes - 1) // 2
+
+    if prob_of_creating_edge_between_two_nodes <= 0 or total_pairs == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    prob = min(prob_of_creating_edge_between_two_nodes, 1.0)
+
+    node_1_blocks = []
+    node_2_blocks = []
+
+    # Position (in the sequence of pairs) of the last edge found so far
+    last_position = -1
+    while last_position < total_pairs - 1:
+        # Draw enough gaps to (most likely) reach the end of the sequence, up to max_pairs_per_draw at a time
+        expected_edges_left = (total_pairs - 1 - last_position) * prob
+        num_gaps = min(int(expected_edges_left * 1.05) + 1024, max_pairs_per_draw)
+
+        positions = last_position + np.cumsum(rng.geometric(prob, size=num_gaps))
+        positions = positions[positions < total_pairs]
+
+        if len(positions) == 0:
+            break
+
+        # Row r of the lower triangle starts at position r * (r - 1) / 2. Invert that with a square
+        # root, then correct any rows that are off by one due to floating point rounding
+        rows = ((1 + np.sqrt(1 + 8 * positions.astype(np.float64))) // 2).astype(np.int64)
+        rows[rows * (rows - 1) // 2 > positions] -= 1
+        rows[rows * (rows + 1) // 2 <= positions] += 1
+
+        node_1_blocks.append(rows)
+        node_2_blocks.append(positions - rows * (rows - 1) // 2)
+
+        last_position = positions[-1]
+
+        # Fewer than num_gaps positions fitted, so the last gap already ran past the end of the sequence
+        if len(positions) < num_gaps:
+            break
+
+    return concatenate_edge_blocks(node_1_blocks, node_2_blocks)
+
+
+# Joins the per-block edge arrays built up by the samplers
+def concatenate_edge_blocks(node_1_blocks, node_2_blocks):
+    if not node_1_blocks:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    return np.concatenate(node_1_blocks), np.concatenate(node_2_blocks)
+
+
+# Returns the number of lower triangle node pairs in rows first_row up to (but not including) end_row
+def pairs_in_rows(first_row, end_row):
+    return (end_row * (end_row - 1) - first_row * (first_row - 1)) // 2
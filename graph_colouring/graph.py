@@ -0,0 +1,278 @@
+import math
+
+from graph_colouring.bitset_graph import BitsetGraph
+from graph_colouring.csr_graph import CSRGraph
+from graph_colouring.palette import make_color_array
+from graph_colouring.random_source import as_random_source
+
+
+# Creates the adjacency matrix of a random simple graph and returns it
+# (based on Erdos-Renyi random graph model). rng may be None (module-global random functions), a random.Random,
+# a numpy Generator or a RandomSource, as for all the stochastic functions in this package
+def create_random_simple_graph(num_nodes, prob_of_creating_edge_between_two_nodes, rng=None):
+    random_source = as_random_source(rng)
+
+    # This will be a square matrix.
+    # It is adjacency matrix of a simple graph (no self-edges and
+    # # no more than one edge between any pair of vertices)
+    adj_matrix = []
+
+    for x in range(num_nodes):
+        row = []
+
+        # Draw the random numbers for the whole row at once
+        draws = random_source.random_batch(x)
+
+        # Fill in one half of matrix (including diagonals which are set to 0)
+        for y in range(x + 1):
+            if x == y:
+                row.append(0)
+            else:
+                row.append(1 if draws[y] < prob_of_creating_edge_between_two_nodes else 0)
+
+        adj_matrix.append(row)
+
+    # We have constructed half of the adjacency matrix as well as the diagonal
+    # values (all 0). We will now fill in the other half of the adjacency matrix
+    # and maintain matrix symmetry (this is a simple graph).
+    for x in range(num_nodes):
+        # For every row, iterate from one element beneath its diagonal element
+        # (x + 1) down to the bottom of the respective column (num_nodes - 1)
+        total_app = 0
+        len_before_app = len(adj_matrix[x])
+        for y in range(x + 1, num_nodes):
+            # Append all the column values to the current row
+            # down from the diagonal value (maintain matrix symmetry)
+            # adj_matrix[y][x]: Fix the column with [x], move down the column rows as [y] is incremented
+            total_app += 1
+            adj_matrix[x].append(adj_matrix[y][x])
+
+    return adj_matrix
+
+
+# Returns a list of neighbours of a given node.
+# Note that nodes are identified by their zero-based index e.g., for 30 nodes, node 'IDs' are 0-29
+def get_node_neighbours(node, adj_matrix):
+    if isinstance(adj_matrix, (CSRGraph, BitsetGraph)):
+        return adj_matrix.neighbours(node).tolist()
+
+    node_row = adj_matrix[node]
+    neighbours = [n for n in range(len(node_row)) if node_row[n] == 1]
+
+    return neighbours
+
+
+# Given a list of available color indices, randomly assign
+# colors to nodes. Returns a compact array of color indices
+# corresponding to the ordering of node rows in the adjacency matrix
+def rand_initialise_colors(adj_matrix, colors_list, rng=None):
+    random_source = as_random_source(rng)
+    colors = make_color_array()
+
+    for node in range(len(adj_matrix)):
+        # Randomly assign a color from the list to a node
+        color_index = random_source.randint(0, len(colors_list) - 1)
+        colors.append(colors_list[color_index])
+
+    return colors
+
+
+# Warm start alternative to rand_initialise_colors for when the list of available colors changes. Starts from
+# previous_colors (e.g., the last valid coloring) and only recolors the nodes whose color is no longer in
+# colors_list, giving each the first color in colors_list that none of its neighbours use (or a random color
+# from colors_list if its neighbours use them all). Returns a new compact array of color indices
+def warm_start_colors(previous_colors, colors_list, neighbour_index, rng=None):
+    random_source = as_random_source(rng)
+    colors = make_color_array(previous_colors)
+    available_colors = set(colors_list)
+
+    for node in range(len(colors)):
+        if colors[node] in available_colors:
+            continue
+
+        unique_colors_of_neighbours = set([colors[neighbour] for neighbour in neighbour_index.neighbours[node]])
+        free_colors = [color for color in colors_list if color not in unique_colors_of_neighbours]
+
+        colors[node] = free_colors[0] if free_colors else random_source.choice(colors_list)
+
+    return colors
+
+
+# Returns the color currently associated with a particular node
+def get_node_color(node, colors):
+    return colors[node]
+
+
+# Returns the total number of color conflicts in the graph
+# specified by adj_matrix and its current coloring
+def get_color_conflicts(adj_matrix, colors):
+    if isinstance(adj_matrix, (CSRGraph, BitsetGraph)):
+        return adj_matrix.count_conflicts(colors)
+
+    conflicts = 0
+
+    for node_1 in range(len(adj_matrix)):
+        # We only want to iterate through the row up to but not including the diagonal
+        # i.e., iterate through one half of the adjacency matrix so as not to double-count conflicts
+        # e.g. if node 1 <--> node 5 and they have the same color, we want to count that conflict
+        # once and not again for node 5 <--> node 1
+        for node_2 in range(node_1):
+            # If two nodes are adjacent, check if there is a color
+            # conflict between them
+            if adj_matrix[node_1][node_2] == 1:
+                if get_node_color(node_1, colors) == get_node_color(node_2, colors):
+                    conflicts += 1
+
+    return conflicts
+
+
+# Returns True if there is an edge between node_1 and node_2. adj_matrix may be a list-of-lists or NumPy
+# adjacency matrix, a CSRGraph or a BitsetGraph
+def has_edge(adj_matrix, node_1, node_2):
+    if isinstance(adj_matrix, (CSRGraph, BitsetGraph)):
+        return bool(adj_matrix.has_edge(node_1, node_2))
+
+    return adj_matrix[node_1][node_2] == 1
+
+
+# The single place where edges are added to and removed from a graph. Flips (removes if it exists, otherwise adds)
+# the edge of every given (node_1, node_2) pair, in order, so a pair given twice is left unchanged:
+# - an adjacency matrix has both adj_matrix[node_1][node_2] and adj_matrix[node_2][node_1] updated, so it stays
+#   symmetric and get_node_neighbours (which reads whole rows) sees the same graph as get_color_conflicts
+# - a CSRGraph is rebuilt once for the whole batch
+# - if a neighbour_index is given, it is told about every flip, and passes it on to its edge listeners (e.g.,
+#   a ConflictTracker and its ForbiddenColorMasks), so every structure derived from the graph stays in sync. An
+#   index that reads its neighbours from adj_matrix itself is only told whether each flip added or removed an edge
+# Returns the flipped pairs with node_1 > node_2.
+def flip_edges(adj_matrix, pairs, neighbour_index=None):
+    flipped_pairs = []
+
+    for node_1, node_2 in pairs:
+        if node_1 == node_2:
+            raise ValueError(f"Cannot flip self-edge of node {node_1} (this is a simple graph)")
+
+        flipped_pairs.append((max(node_1, node_2), min(node_1, node_2)))
+
+    # Work out what each flip does before the batch is applied, following pairs that are flipped more than once
+    index_reads_graph = neighbour_index is not None and neighbour_index.graph is adj_matrix
+    if index_reads_graph:
+        edge_states = {}
+        edges_added = []
+        for pair in flipped_pairs:
+            edge_states[pair] = not edge_states[pair] if pair in edge_states else not has_edge(adj_matrix, *pair)
+            edges_added.append(edge_states[pair])
+
+    if isinstance(adj_matrix, (CSRGraph, BitsetGraph)):
+        adj_matrix.flip_edges(flipped_pairs)
+    else:
+        for node_1, node_2 in flipped_pairs:
+            new_value = 1 if adj_matrix[node_1][node_2] == 0 else 0
+            adj_matrix[node_1][node_2] = new_value
+            adj_matrix[node_2][node_1] = new_value
+
+    if index_reads_graph:
+        for (node_1, node_2), edge_added in zip(flipped_pairs, edges_added):
+            neighbour_index.record_edge_flip(node_1, node_2, edge_added)
+    elif neighbour_index is not None:
+        for node_1, node_2 in flipped_pairs:
+            neighbour_index.flip_edge(node_1, node_2)
+
+    return flipped_pairs
+
+
+# Adds an edge for every given pair of nodes that doesn't have one yet (see flip_edges).
+# Returns the pairs that were added, with node_1 > node_2
+def add_edges(adj_matrix, pairs, neighbour_index=None):
+    pairs_to_add = set([(max(node_1, node_2), min(node_1, node_2)) for node_1, node_2 in pairs])
+    pairs_to_add = [pair for pair in sorted(pairs_to_add) if not has_edge(adj_matrix, *pair)]
+
+    return flip_edges(adj_matrix, pairs_to_add, neighbour_index)
+
+
+# Removes the edge of every given pair of nodes that has one (see flip_edges).
+# Returns the pairs that were removed, with node_1 > node_2
+def remove_edges(adj_matrix, pairs, neighbour_index=None):
+    pairs_to_remove = set([(max(node_1, node_2), min(node_1, node_2)) for node_1, node_2 in pairs])
+    pairs_to_remove = [pair for pair in sorted(pairs_to_remove) if has_edge(adj_matrix, *pair)]
+
+    return flip_edges(adj_matrix, pairs_to_remove, neighbour_index)
+
+
+# Removes the edge between node_1 and node_2 if it exists, otherwise adds it (see flip_edges).
+# Returns True if the edge was added and False if it was removed
+def flip_edge(adj_matrix, node_1, node_2, neighbour_index=None):
+    flip_edges(adj_matrix, [(node_1, node_2)], neighbour_index)
+
+    return has_edge(adj_matrix, node_1, node_2)
+
+
+# Adds the edge between node_1 and node_2 (see flip_edges). Returns False if it already existed
+def add_edge(adj_matrix, node_1, node_2, neighbour_index=None):
+    return len(add_edges(adj_matrix, [(node_1, node_2)], neighbour_index)) == 1
+
+
+# Removes the edge between node_1 and node_2 (see flip_edges). Returns False if there was no such edge
+def remove_edge(adj_matrix, node_1, node_2, neighbour_index=None):
+    return len(remove_edges(adj_matrix, [(node_1, node_2)], neighbour_index)) == 1
+
+
+# Takes an adjacency matrix and randomly chooses num_adjencies_to_reverse pairs of nodes.
+# For each selected pair:
+# - If an edge exists, is it deleted.
+# - If an edge doesn't exist, it is added.
+# The pairs are flipped with flip_edges, so both halves of an adjacency matrix are updated and, if a
+# neighbour_index is given, it (and its edge listeners) stay in sync with the graph.
+def reverse_n_adjacencies(adj_matrix, num_adjencies_to_reverse, neighbour_index=None, rng=None):
+    random_source = as_random_source(rng)
+    num_nodes = len(adj_matrix)
+    max_edges = (num_nodes * (num_nodes - 1)) / 2
+
+    adjacencies_reversed = 0
+
+    # The selected pairs are collected and flipped together at the end (a CSRGraph is rebuilt on every flip)
+    pairs_to_flip = []
+
+    # Outer while loop to ensure that we do add/remove num_adjencies_to_reverse edges
+    while adjacencies_reversed < num_adjencies_to_reverse:
+        for node_1 in range(len(adj_matrix)):
+            # We only want to iterate through the row up to but not including the diagonal i.e., iterate
+            # through one half of the adjacency matrix so each pair of nodes is only considered once per pass.
+            # Draw the random numbers for the whole row at once
+            draws = random_source.random_batch(node_1)
+
+            for node_2 in range(node_1):
+                # Remove existing/add new edge with probability (num_adjencies_to_reverse / num_nodes)
+                if draws[node_2] < num_adjencies_to_reverse / max_edges:
+                    # 'Flip' the adjacency value i.e., remove or add an edge between node_1 and node_2
+                    pairs_to_flip.append((node_1, node_2))
+                    adjacencies_reversed += 1
+
+    flip_edges(adj_matrix, pairs_to_flip, neighbour_index)
+
+    # Return the modified adjacency matrix
+    return adj_matrix
+
+
+# Like reverse_n_adjacencies, but flips exactly num_adjacencies_to_reverse distinct pairs of nodes, sampled
+# directly rather than by walking the whole lower triangle of the adjacency matrix, so it costs O(num pairs)
+# instead of O(num_nodes^2). Works on a list-of-lists or NumPy adjacency matrix, a CSRGraph or a BitsetGraph.
+# Returns the list of flipped (node_1, node_2) pairs, with node_1 > node_2.
+def reverse_n_random_adjacencies(adj_matrix, num_adjacencies_to_reverse, neighbour_index=None, rng=None):
+    num_nodes = len(adj_matrix)
+    max_edges = num_nodes * (num_nodes - 1) // 2
+
+    if num_adjacencies_to_reverse > max_edges:
+        raise ValueError(f"Cannot reverse {num_adjacencies_to_reverse} adjacencies in a graph with only "
+                         f"{max_edges} pairs of nodes")
+
+    pairs_to_flip = []
+
+    # Number the lower triangle pairs row by row: row node_1 starts at pair number node_1 * (node_1 - 1) / 2.
+    # sample_range picks distinct pair numbers without building the range
+    for pair_number in as_random_source(rng).sample_range(max_edges, num_adjacencies_to_reverse):
+        node_1 = (1 + math.isqrt(1 + 8 * pair_number)) // 2
+        node_2 = pair_number - node_1 * (node_1 - 1) // 2
+        pairs_to_flip.append((node_1, node_2))
+
+    # 'Flip' the adjacency values i.e., remove or add an edge between each node_1 and node_2
+    return flip_edges(adj_matrix, pairs_to_flip, neighbour_index)
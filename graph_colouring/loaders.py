@@ -0,0 +1,175 @@
+import os
+import re
+import warnings
+
+import numpy as np
+
+from graph_colouring.csr_graph import CSRGraph
+
+# Approximate number of bytes of a graph file parsed at a time, so that memory stays bounded while reading
+# very large files
+read_chunk_size = 2 ** 24
+
+# File extensions recognised by load_graph
+dimacs_extensions = (".col", ".dimacs")
+
+# DIMACS lines are blank or start (after any spaces) with "c" (comment), "p" (problem) or "e" (edge). Lines that
+# don't hold an edge are removed from the text before it is parsed, as is the "e" of those that do
+dimacs_unexpected_line = re.compile(r"^(?![ \t]*(?:[cpe](?:[ \t]|$)|$)).+$", re.MULTILINE)
+dimacs_problem_line = re.compile(r"^[ \t]*p[ \t]+\S+[ \t]+(\d+)", re.MULTILINE)
+dimacs_non_edge_line = re.compile(r"^(?![ \t]*e[ \t]).*$", re.MULTILINE)
+dimacs_edge_line_prefix = re.compile(r"^[ \t]*e", re.MULTILINE)
+edge_list_comment_line = re.compile(r"^[ \t]*[#%].*$", re.MULTILINE)
+
+
+# Yields the text of a file in whole lines, about read_chunk_size bytes at a time
+def read_text_chunks(path):
+    with open(path) as file:
+        while True:
+            lines = file.readlines(read_chunk_size)
+            if not lines:
+                return
+            yield "".join(lines)
+
+
+# Parses the whitespace separated numbers in text into a num_lines x num_columns array, with
+# one vectorized call rather than by splitting each line into a tuple
+def parse_number_lines(text, num_columns, dtype=np.int64):
+    # NumPy only warns (and stops parsing) when it meets something that isn't a number
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(text, dtype=dtype, sep=" ")
+        except DeprecationWarning:
+            raise ValueError("Found a value that is not a number") from None
+
+    if len(values) % num_columns != 0:
+        raise ValueError(f"Expected {num_columns} numbers per line")
+
+    return values.reshape(-1, num_columns)
+
+
+# Builds a CSRGraph from edge arrays that may contain self-edges and the same edge more than once
+# (in either direction), both of which are dropped
+def build_csr_graph(num_nodes, node_1s, node_2s):
+    if len(node_1s) > 0 and max(int(node_1s.max()), int(node_2s.max())) >= num_nodes:
+        raise ValueError(f"Edge refers to a node outside of the graph's {num_nodes} nodes")
+
+    if len(node_1s) > 0 and min(int(node_1s.min()), int(node_2s.min())) < 0:
+        raise ValueError("Edge refers to a node numbered below the graph's first node")
+
+    not_self_edge = node_1s != node_2s
+    keys = np.sort(np.maximum(node_1s, node_2s)[not_self_edge] * num_nodes
+                   + np.minimum(node_1s, node_2s)[not_self_edge])
+    keys = keys[np.concatenate([np.ones(min(len(keys), 1), dtype=bool), keys[1:] != keys[:-1]])]
+
+    return CSRGraph.from_edges(num_nodes, keys // num_nodes, keys % num_nodes)
+
+
+# Streams a graph in DIMACS .col format into a CSRGraph: a "p edge <num nodes> <num edges>" line followed by
+# "e <node> <node>" lines with nodes numbered from 1 (node i becomes node i - 1). Comment ("c") and blank lines
+# are ignored, and any other line raises a ValueError
+def load_dimacs_col(path):
+    num_nodes = None
+    edge_blocks = []
+
+    for text in read_text_chunks(path):
+        unexpected_line = dimacs_unexpected_line.search(text)
+        if unexpected_line is not None:
+            raise ValueError(f"{path} has a line that is not a DIMACS comment, problem or edge line: "
+                             f"'{unexpected_line.group()}'")
+
+        problem_line = dimacs_problem_line.search(text)
+        if problem_line is not None:
+            num_nodes = int(problem_line.group(1))
+
+        edge_text = dimacs_edge_line_prefix.sub(" ", dimacs_non_edge_line.sub("", text))
+
+        # np.fromstring parses text without any numbers as a single 0, so skip chunks without edges
+        if edge_text.strip():
+            edge_blocks.append(parse_number_lines(edge_text, 2))
+
+    if num_nodes is None:
+        raise ValueError(f"{path} has no 'p' line giving the number of nodes")
+
+    edges = np.concatenate(edge_blocks) - 1 if edge_blocks else np.zeros((0, 2), dtype=np.int64)
+
+    return build_csr_graph(num_nodes, edges[:, 0], edges[:, 1])
+
+
+# Streams a plain edge list into a CSRGraph: one "<node> <node>" line per edge, with nodes numbered from
+# first_node_index. Any further columns on a line (e.g., weights) are ignored, as are blank lines and comment
+# lines starting with "#" or "%". num_nodes defaults to one more than the largest node in the file
+def load_edge_list(path, num_nodes=None, first_node_index=0):
+    num_columns = None
+    edge_blocks = []
+
+    for text in read_text_chunks(path):
+        edge_text = edge_list_comment_line.sub("", text)
+
+        # np.fromstring parses text without any numbers as a single 0, so skip chunks without edges
+        if not edge_text.strip():
+            continue
+
+        if num_columns is None:
+            first_edge_line = re.search(r"^.*\S.*$", edge_text, re.MULTILINE)
+            num_columns = len(first_edge_line.group().split())
+
+        # Further columns may hold non-integers, so only parse as integers if there are none
+        if num_columns == 2:
+            edges = parse_number_lines(edge_text, 2)
+        else:
+            edges = parse_number_lines(edge_text, num_columns, np.float64)[:, :2].astype(np.int64)
+
+        edge_blocks.append(edges - first_node_index)
+
+    edges = np.concatenate(edge_blocks) if edge_blocks else np.zeros((0, 2), dtype=np.int64)
+
+    if num_nodes is None:
+        num_nodes = int(edges.max()) + 1 if len(edges) > 0 else 0
+
+    return build_csr_graph(num_nodes, edges[:, 0], edges[:, 1])
+
+
+# Paths of the indptr and indices .npy files cached for the graph file at path
+def get_cache_paths(path):
+    return f"{path}.indptr.npy", f"{path}.indices.npy"
+
+
+# Writes graph's CSR arrays to the .npy cache files of the graph file at path
+def save_csr_cache(graph, path):
+    indptr_path, indices_path = get_cache_paths(path)
+    np.save(indptr_path, graph.indptr)
+    np.save(indices_path, graph.indices)
+
+
+# Returns the CSRGraph cached for the graph file at path, with its arrays memory-mapped (read-only) rather than
+# read into memory, or None if there is no cache or it is older than the graph file
+def load_csr_cache(path):
+    indptr_path, indices_path = get_cache_paths(path)
+
+    for cache_path in (indptr_path, indices_path):
+        if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(path):
+            return None
+
+    return CSRGraph(np.load(indptr_path, mmap_mode="r"), np.load(indices_path, mmap_mode="r"))
+
+
+# Loads a graph file into a CSRGraph, as a DIMACS .col file if its extension is one of dimacs_extensions and as
+# an edge list (see load_edge_list) otherwise. If use_cache, the parsed graph is cached next to the file as .npy
+# files, which later loads memory-map instead of parsing the file again
+def load_graph(path, use_cache=True):
+    if use_cache:
+        graph = load_csr_cache(path)
+        if graph is not None:
+            return graph
+
+    if path.lower().endswith(dimacs_extensions):
+        graph = load_dimacs_col(path)
+    else:
+        graph = load_edge_list(path)
+
+    if use_cache:
+        save_csr_cache(graph, path)
+
+    return graph
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+
+
+# A time series of metric values, each recorded at some iteration, held in preallocated NumPy arrays rather than
+# Python lists. A value of None is stored as NaN, which leaves a gap when the series is plotted.
+# When the arrays are full they are written to flush_directory (if given) as a numbered .npz chunk and reused, so
+# memory stays flat however long the run is. Otherwise they are grown.
+class MetricSeries:
+    def __init__(self, name, capacity, flush_directory=None):
+        self.name = name
+        self.iterations = np.zeros(max(capacity, 1), dtype=np.int64)
+        self.values = np.full(max(capacity, 1), np.nan)
+        self.length = 0
+
+        self.flush_directory = flush_directory
+        self.num_flushed_chunks = 0
+
+    def append(self, iteration, value):
+        if self.length == len(self.values):
+            if self.flush_directory is not None:
+                self.flush()
+            else:
+                self.grow()
+
+        self.iterations[self.length] = iteration
+        self.values[self.length] = np.nan if value is None else value
+        self.length += 1
+
+    def grow(self):
+        self.iterations = np.concatenate([self.iterations, np.zeros(len(self.iterations), dtype=np.int64)])
+        self.values = np.concatenate([self.values, np.full(len(self.values), np.nan)])
+
+    def get_chunk_path(self, chunk_index):
+        return os.path.join(self.flush_directory, f"{self.name}_{chunk_index:06d}.npz")
+
+    # Writes the values recorded since the last flush to the next chunk file
+    def flush(self):
+        if self.flush_directory is None or self.length == 0:
+            return
+
+        os.makedirs(self.flush_directory, exist_ok=True)
+        np.savez(self.get_chunk_path(self.num_flushed_chunks), iterations=self.iterations[:self.length],
+                 values=self.values[:self.length])
+        self.num_flushed_chunks += 1
+        self.length = 0
+
+    # Returns the iterations and values of the whole series (including flushed chunks) as two arrays
+    def to_arrays(self):
+        iteration_chunks = []
+        value_chunks = []
+
+        for chunk_index in range(self.num_flushed_chunks):
+            with np.load(self.get_chunk_path(chunk_index)) as chunk:
+                iteration_chunks.append(chunk["iterations"])
+                value_chunks.append(chunk["values"])
+
+        iteration_chunks.append(self.iterations[:self.length])
+        value_chunks.append(self.values[:self.length])
+
+        return np.concatenate(iteration_chunks), np.concatenate(value_chunks)
+
+
+# Records several named MetricSeries, each with room for capacity values before it is flushed or grown
+# (e.g., capacity = the maximum number of iterations, for series recorded at most once per iteration)
+class MetricsRecorder:
+    def __init__(self, series_names, capacity, flush_directory=None):
+        self.series = {name: MetricSeries(name, capacity, flush_directory) for name in series_names}
+
+    def record(self, name, iteration, value):
+        self.series[name].append(iteration, value)
+
+    # Returns the iterations and values of the named series as two arrays
+    def get_arrays(self, name):
+        return self.series[name].to_arrays()
+
+    # Writes any values still held in memory to disk (if the recorder has a flush_directory)
+    def flush(self):
+        for series in self.series.values():
+            series.flush()
@@ -0,0 +1,134 @@
+import numpy as np
+
+from graph_colouring.bitset_graph import BitsetGraph
+from graph_colouring.csr_graph import CSRGraph
+
+
+# Neighbours of every node read on demand from a CSRGraph or BitsetGraph, in place of the lists of a
+# NeighbourIndex: graph_neighbour_lists[node] is a list of node's neighbours, as with NeighbourIndex.neighbours.
+# Nothing is copied, so the graph's compact representation is the only copy of the edges held in memory
+class GraphNeighbourLists:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __len__(self):
+        return len(self.graph)
+
+    def __getitem__(self, node):
+        return self.graph.neighbours(node).tolist()
+
+    def __iter__(self):
+        return (self[node] for node in range(len(self.graph)))
+
+
+# Precomputed list of neighbours for every node, built once from the adjacency matrix so that
+# looking up a node's neighbours doesn't require a scan of its whole row. Must be kept in sync
+# with the graph by calling flip_edge whenever an edge is added or removed.
+# A CSRGraph or BitsetGraph already looks up neighbours without a scan, so for those the index reads them from
+# the graph itself (see GraphNeighbourLists) rather than holding a much larger copy of the graph in lists.
+# Every flip is passed on as an edge change event to the registered edge listeners (e.g., a ConflictTracker),
+# so they can update themselves from the two end nodes of the flipped pair only.
+class NeighbourIndex:
+    # adj_matrix may be a list-of-lists adjacency matrix, a NumPy adjacency matrix, a CSRGraph or a BitsetGraph.
+    # Only the lower triangle of an adjacency matrix is read, matching the half that get_color_conflicts reads
+    def __init__(self, adj_matrix):
+        # Objects with an edge_flipped(node_1, node_2, edge_added) method
+        self.edge_listeners = []
+
+        # Number of edges flipped since the index was built. Changes every time the graph changes
+        self.version = 0
+
+        # The CSRGraph or BitsetGraph that neighbours are read from, or None if they are held in lists
+        self.graph = None
+
+        if isinstance(adj_matrix, (CSRGraph, BitsetGraph)):
+            self.graph = adj_matrix
+            self.neighbours = GraphNeighbourLists(adj_matrix)
+            return
+
+        # Reading a NumPy matrix element by element is slow, so convert it with vectorized operations first
+        if isinstance(adj_matrix, np.ndarray):
+            csr_graph = CSRGraph.from_adj_matrix(adj_matrix)
+            self.neighbours = [csr_graph.neighbours(node).tolist() for node in range(len(csr_graph))]
+            return
+
+        self.neighbours = [[] for _ in range(len(adj_matrix))]
+
+        for node_1 in range(len(adj_matrix)):
+            for node_2 in range(node_1):
+                if adj_matrix[node_1][node_2] == 1:
+                    self.neighbours[node_1].append(node_2)
+                    self.neighbours[node_2].append(node_1)
+
+    def __len__(self):
+        return len(self.neighbours)
+
+    def get_neighbours(self, node):
+        return self.neighbours[node]
+
+    # Returns a list of the degree of every node, without building any neighbour lists
+    def get_degrees(self):
+        if self.graph is not None:
+            return self.graph.degrees().tolist()
+
+        return [len(neighbours) for neighbours in self.neighbours]
+
+    def has_edge(self, node_1, node_2):
+        if self.graph is not None:
+            return bool(self.graph.has_edge(node_1, node_2))
+
+        return node_2 in self.neighbours[node_1]
+
+    # Yields every edge once as a (node_1, node_2) pair with node_1 > node_2
+    def edges(self):
+        if self.graph is not None:
+            node_1s, node_2s = self.graph.edges()
+            yield from zip(node_1s.tolist(), node_2s.tolist())
+            return
+
+        for node_1, neighbours in enumerate(self.neighbours):
+            for node_2 in neighbours:
+                if node_2 < node_1:
+                    yield node_1, node_2
+
+    # Returns the number of edges whose two end nodes share a color
+    def count_conflicts(self, colors):
+        if self.graph is not None:
+            return self.graph.count_conflicts(colors)
+
+        return sum(1 for node_1, node_2 in self.edges() if colors[node_1] == colors[node_2])
+
+    def add_edge_listener(self, listener):
+        self.edge_listeners.append(listener)
+
+    def remove_edge_listener(self, listener):
+        self.edge_listeners.remove(listener)
+
+    # Removes the edge between node_1 and node_2 if it exists, otherwise adds it, and tells the edge listeners.
+    # If neighbours are read from the graph, the graph itself is flipped.
+    # Returns True if the edge was added and False if it was removed
+    def flip_edge(self, node_1, node_2):
+        if self.graph is not None:
+            self.graph.flip_edge(node_1, node_2)
+            edge_added = self.has_edge(node_1, node_2)
+        else:
+            edge_added = node_2 not in self.neighbours[node_1]
+
+            if edge_added:
+                self.neighbours[node_1].append(node_2)
+                self.neighbours[node_2].append(node_1)
+            else:
+                self.neighbours[node_1].remove(node_2)
+                self.neighbours[node_2].remove(node_1)
+
+        self.record_edge_flip(node_1, node_2, edge_added)
+
+        return edge_added
+
+    # Records a flip of the edge between node_1 and node_2 that has already been made to the neighbours (e.g., to
+    # the graph they are read from) and tells the edge listeners
+    def record_edge_flip(self, node_1, node_2, edge_added):
+        self.version += 1
+
+        for listener in self.edge_listeners:
+            listener.edge_flipped(node_1, node_2, edge_added)
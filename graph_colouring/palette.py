@@ -0,0 +1,33 @@
+from array import array
+
+# Typecode of the compact arrays holding node colors as color indices (one unsigned byte per node, up to 256 colors)
+color_index_typecode = "B"
+
+
+# Returns a compact array of color indices, optionally filled from an iterable of indices
+def make_color_array(color_indices=()):
+    return array(color_index_typecode, color_indices)
+
+
+# Maps between the small integer color indices that node agents work with and the
+# color names that are only needed when drawing the graph (e.g., with nx.draw).
+# Color index i corresponds to color_names[i].
+class Palette:
+    def __init__(self, color_names):
+        self.color_names = list(color_names)
+        self.name_to_index = {name: index for index, name in enumerate(self.color_names)}
+
+    def __len__(self):
+        return len(self.color_names)
+
+    # Returns the indices of the first num_colors colors, i.e., the index equivalent of color_names[:num_colors]
+    def get_color_indices(self, num_colors):
+        return list(range(min(num_colors, len(self.color_names))))
+
+    # Converts a coloring of color indices to a list of color names
+    def to_names(self, colors):
+        return [self.color_names[color] for color in colors]
+
+    # Converts a list of color names to a compact array of color indices
+    def to_indices(self, color_names):
+        return make_color_array(self.name_to_index[name] for name in color_names)
@@ -0,0 +1,183 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from graph_colouring.agents import run_node_agents
+from graph_colouring.graph import rand_initialise_colors
+from graph_colouring.neighbour_index import NeighbourIndex
+from graph_colouring.random_source import as_random_source
+
+
+# Lets the node agents try to color the graph with num_colors colors, starting from a random coloring.
+# The initial coloring and the agents' decisions are drawn from rng (see rand_initialise_colors).
+# Returns the valid coloring, or None if the agents didn't find one within max_iterations sweeps
+def try_palette_size(adj_matrix, neighbour_index, num_colors, prob_of_node_changing_color, max_iterations,
+                     sweep_mode="all_nodes", should_stop=None, rng=None):
+    random_source = as_random_source(rng)
+    colors = rand_initialise_colors(adj_matrix, list(range(num_colors)), random_source)
+
+    conflicts, _ = run_node_agents(adj_matrix, neighbour_index, colors, num_colors, prob_of_node_changing_color,
+                                   max_iterations, sweep_mode, should_stop, random_source)
+
+    return colors if conflicts == 0 else None
+
+
+# Set once in each worker process by init_palette_race_worker, so the graph is only sent to each worker once
+worker_adj_matrix = None
+worker_neighbour_index = None
+worker_smallest_success = None
+
+
+def init_palette_race_worker(adj_matrix, smallest_success, sweep_mode):
+    global worker_adj_matrix, worker_neighbour_index, worker_smallest_success
+
+    worker_adj_matrix = adj_matrix
+    # The "vectorized" sweep mode reads the CSRGraph directly and doesn't need an index
+    worker_neighbour_index = NeighbourIndex(adj_matrix) if sweep_mode != "vectorized" else None
+    worker_smallest_success = smallest_success
+
+
+# Runs in a worker process: tries to color the worker's graph with num_colors colors from a random coloring
+# seeded with seed. Gives up early once some other worker has succeeded with num_colors colors or fewer.
+# Returns num_colors and the valid coloring, or None if no valid coloring was found
+def race_palette_size(num_colors, seed, prob_of_node_changing_color, max_iterations, sweep_mode):
+    def smaller_palette_succeeded():
+        return worker_smallest_success.value <= num_colors
+
+    if smaller_palette_succeeded():
+        return num_colors, None
+
+    coloring = try_palette_size(worker_adj_matrix, worker_neighbour_index, num_colors, prob_of_node_changing_color,
+                                max_iterations, sweep_mode, should_stop=smaller_palette_succeeded,
+                                rng=np.random.default_rng(seed))
+
+    return num_colors, coloring
+
+
+# Alternative to trying palette sizes one after another: tries every size in palette_sizes at the same time,
+# seeds_per_size times each (from independent seeds derived from base_seed), across a pool of max_workers
+# processes (defaults to one per CPU). Once a palette size succeeds, attempts at that size or larger that
+# haven't started are cancelled and running ones stop at their next sweep.
+# Returns the smallest palette size that succeeded and its coloring, or (None, None) if none did
+def race_palette_sizes(adj_matrix, palette_sizes, seeds_per_size, prob_of_node_changing_color, max_iterations,
+                       max_workers=None, base_seed=None, sweep_mode="all_nodes"):
+    palette_sizes = list(palette_sizes)
+    seeds = np.random.SeedSequence(base_seed).generate_state(len(palette_sizes) * seeds_per_size).tolist()
+
+    best_num_colors = None
+    best_coloring = None
+
+    with multiprocessing.Manager() as manager:
+        # Smallest palette size that has succeeded so far, read by the workers
+        smallest_success = manager.Value("i", max(palette_sizes) + 1)
+
+        with ProcessPoolExecutor(max_workers, initializer=init_palette_race_worker,
+                                 initargs=(adj_matrix, smallest_success, sweep_mode)) as executor:
+            futures = {}
+            for attempt, seed in enumerate(seeds):
+                num_colors = palette_sizes[attempt % len(palette_sizes)]
+                future = executor.submit(race_palette_size, num_colors, seed, prob_of_node_changing_color,
+                                         max_iterations, sweep_mode)
+                futures[future] = num_colors
+
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+
+                num_colors, coloring = future.result()
+
+                if coloring is not None and (best_num_colors is None or num_colors < best_num_colors):
+                    best_num_colors = num_colors
+                    best_coloring = coloring
+                    smallest_success.value = num_colors
+
+                    for other_future, other_num_colors in futures.items():
+                        if other_num_colors >= num_colors:
+                            other_future.cancel()
+
+    return best_num_colors, best_coloring
+
+
+# Colors nodes one at a time, highest degree first, each with the lowest color index not used by its
+# neighbours (Welsh-Powell). The number of colors used is an upper bound on the number of colors needed.
+# Returns the colors as a plain list, as a dense graph can need more colors than fit in a color array
+def greedy_coloring(neighbour_index):
+    num_nodes = len(neighbour_index)
+    colors = [0] * num_nodes
+    colored = [False] * num_nodes
+
+    for node in sorted(range(num_nodes), key=neighbour_index.get_degrees().__getitem__, reverse=True):
+        unique_colors_of_neighbours = set([colors[neighbour] for neighbour in neighbour_index.neighbours[node]
+                                           if colored[neighbour]])
+        color = 0
+        while color in unique_colors_of_neighbours:
+            color += 1
+
+        colors[node] = color
+        colored[node] = True
+
+    return colors
+
+
+# Returns the size of a clique found greedily: starting from each of the max_start_nodes highest degree nodes,
+# keep adding the highest degree node that is adjacent to every node in the clique so far. Every node of a
+# clique needs its own color, so this is a lower bound on the number of colors needed
+def greedy_clique_size(neighbour_index, max_start_nodes=100):
+    # Looked up for every candidate at every step, so find every degree once up front
+    degree = neighbour_index.get_degrees().__getitem__
+
+    nodes_by_degree = sorted(range(len(neighbour_index)), key=degree, reverse=True)
+    largest_clique_size = 1 if nodes_by_degree else 0
+
+    for start_node in nodes_by_degree[:max_start_nodes]:
+        clique_size = 1
+        candidates = set(neighbour_index.neighbours[start_node])
+
+        while candidates:
+            node = max(candidates, key=degree)
+            clique_size += 1
+            candidates.intersection_update(neighbour_index.neighbours[node])
+
+        largest_clique_size = max(largest_clique_size, clique_size)
+
+    return largest_clique_size
+
+
+# Alternative to trying palette sizes one after another: bisects between a lower bound (greedy_clique_size) and
+# an upper bound (the number of colors of greedy_coloring, capped at max_colors), trying each middle palette size
+# up to attempts_per_size times. Stops as soon as the bounds meet. Assumes that if the agents fail
+# with some number of colors, they would also fail with fewer. The agents draw from rng (see rand_initialise_colors).
+# The greedy coloring only bounds the search and is never returned as the agents' result.
+# Returns the smallest palette size the agents succeeded with and their coloring (both None if they never
+# succeeded), the lower bound and the number of colors of the greedy coloring
+def bisect_palette_size(adj_matrix, neighbour_index, max_colors, prob_of_node_changing_color, max_iterations,
+                        attempts_per_size=1, sweep_mode="all_nodes", rng=None):
+    random_source = as_random_source(rng)
+    lower_bound = greedy_clique_size(neighbour_index)
+
+    num_greedy_colors = len(set(greedy_coloring(neighbour_index)))
+    best_coloring = None
+
+    # Everything below low is known (or assumed) to fail. high is the smallest palette size the agents succeeded
+    # with, starting one above the greedy coloring's size, so the agents also try that size
+    low = min(lower_bound, max_colors)
+    high = min(num_greedy_colors, max_colors) + 1
+
+    while low < high:
+        num_colors = (low + high) // 2
+
+        coloring = None
+        for _ in range(attempts_per_size):
+            coloring = try_palette_size(adj_matrix, neighbour_index, num_colors, prob_of_node_changing_color,
+                                        max_iterations, sweep_mode, rng=random_source)
+            if coloring is not None:
+                break
+
+        if coloring is not None:
+            high = num_colors
+            best_coloring = coloring
+        else:
+            low = num_colors + 1
+
+    return (high if best_coloring is not None else None), best_coloring, lower_bound, num_greedy_colors
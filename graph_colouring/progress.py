@@ -0,0 +1,70 @@
+import json
+import sys
+import time
+
+
+# Reports the progress of the node agents without printing on every iteration:
+# - iteration reports are only made every interval_in_iterations iterations, and at most once every
+#   min_seconds_between_reports seconds
+# - quiet stops anything being printed
+# - if json_lines_file (a path or an open text file) is given, every report is also written to it as one JSON
+#   object per line, with the event name, the seconds since the reporter was created and the reported metrics
+# Callers should pass metrics they already keep up to date (e.g., ConflictTracker.conflicts) rather than
+# recomputing them from the graph for every report.
+class ProgressReporter:
+    def __init__(self, interval_in_iterations=1, min_seconds_between_reports=0.0, quiet=False, json_lines_file=None,
+                 text_file=None):
+        if interval_in_iterations < 1:
+            raise ValueError("interval_in_iterations must be at least 1")
+
+        self.interval_in_iterations = interval_in_iterations
+        self.min_seconds_between_reports = min_seconds_between_reports
+        self.quiet = quiet
+        self.text_file = sys.stdout if text_file is None else text_file
+
+        self.owns_json_lines_file = isinstance(json_lines_file, str)
+        self.json_lines_file = open(json_lines_file, "w") if self.owns_json_lines_file else json_lines_file
+
+        self.start_time = time.perf_counter()
+        self.last_report_time = None
+
+    # Returns True if an iteration report for the given iteration should be made now
+    def is_due(self, iteration):
+        if self.quiet and self.json_lines_file is None:
+            return False
+
+        if iteration % self.interval_in_iterations != 0:
+            return False
+
+        return (self.last_report_time is None
+                or time.perf_counter() - self.last_report_time >= self.min_seconds_between_reports)
+
+    # Reports the metrics of one iteration, e.g. report_iteration(5, current_conflicts=3) prints
+    # "Iteration: 5, Current conflicts: 3". label replaces "Iteration" in the printed line.
+    # Only call this when is_due(iteration) returns True
+    def report_iteration(self, iteration, label="Iteration", **metrics):
+        self.last_report_time = time.perf_counter()
+
+        text = ", ".join([f"{label}: {iteration}"] + [f"{name.replace('_', ' ').capitalize()}: {value}"
+                                                      for name, value in metrics.items()])
+        self.emit("iteration", text, iteration=iteration, **metrics)
+
+    # Reports something other than an iteration (e.g., the end of a run with one color list), printing message
+    def report_event(self, event, message, **fields):
+        self.emit(event, message, **fields)
+
+    def emit(self, event, text, **fields):
+        if not self.quiet:
+            print(text, file=self.text_file)
+
+        if self.json_lines_file is not None:
+            record = {"event": event, "seconds": round(time.perf_counter() - self.start_time, 6)}
+            record.update(fields)
+            self.json_lines_file.write(json.dumps(record) + "\n")
+
+    # Closes the JSON lines file if the reporter opened it
+    def close(self):
+        if self.owns_json_lines_file:
+            self.json_lines_file.close()
+        elif self.json_lines_file is not None:
+            self.json_lines_file.flush()
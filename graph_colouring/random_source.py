@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+
+
+# Gives the stochastic functions one interface over either kind of random number generator they accept:
+# - None: the module-global random functions (shared by the whole process, as before)
+# - a stdlib random.Random
+# - a numpy Generator
+# Give each run (or each thread) its own Random or Generator to make it reproducible and independent of others.
+class RandomSource:
+    def __init__(self, rng=None):
+        self.rng = random if rng is None else rng
+        self.is_numpy = isinstance(rng, np.random.Generator)
+
+    # Returns a uniform random number in [0, 1)
+    def random(self):
+        return float(self.rng.random())
+
+    # Returns a random integer in [low, high], like random.randint
+    def randint(self, low, high):
+        if self.is_numpy:
+            return int(self.rng.integers(low, high + 1))
+
+        return self.rng.randint(low, high)
+
+    # Returns a random element of the non-empty sequence seq
+    def choice(self, seq):
+        if self.is_numpy:
+            return seq[int(self.rng.integers(len(seq)))]
+
+        return self.rng.choice(seq)
+
+    # Returns num_samples distinct integers from range(population_size), without building the range
+    def sample_range(self, population_size, num_samples):
+        if self.is_numpy:
+            return self.rng.choice(population_size, size=num_samples, replace=False).tolist()
+
+        return self.rng.sample(range(population_size), num_samples)
+
+    # Returns a list of size uniform random numbers in [0, 1), drawn in one call for a numpy Generator
+    def random_batch(self, size):
+        if self.is_numpy:
+            return self.rng.random(size).tolist()
+
+        rng_random = self.rng.random
+        return [rng_random() for _ in range(size)]
+
+    # Returns a numpy Generator drawing from this source: the wrapped one, or a new one seeded from it
+    def numpy_generator(self):
+        if self.is_numpy:
+            return self.rng
+
+        return np.random.default_rng(self.rng.getrandbits(64))
+
+
+# Returns rng as a RandomSource (rng may already be one)
+def as_random_source(rng=None):
+    return rng if isinstance(rng, RandomSource) else RandomSource(rng)
+
+
+# Returns a numpy Generator for rng, which may be anything np.random.default_rng accepts (None, an int seed, a
+# SeedSequence or a Generator), a stdlib random.Random or a RandomSource
+def as_numpy_generator(rng=None):
+    if isinstance(rng, (random.Random, RandomSource)):
+        return as_random_source(rng).numpy_generator()
+
+    return np.random.default_rng(rng)
@@ -0,0 +1,75 @@
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from graph_colouring.agents import run_node_agents
+from graph_colouring.generators import create_random_simple_graph_numpy
+from graph_colouring.graph import rand_initialise_colors
+from graph_colouring.neighbour_index import NeighbourIndex
+
+
+# Runs the part_1 experiment once: generates a random graph, then lets the node agents color it with
+# num_palette_colors colors, then one fewer, and so on, until they fail to find a valid coloring.
+# The graph and the agents draw from separate random number streams derived from seed and the configuration
+# (num_nodes and the two probabilities), so runs of different configurations that share a seed are independent
+# and any run can be reproduced from its parameters. Returns a dict describing the run
+def run_experiment(num_nodes, prob_of_creating_edge_between_two_nodes, prob_of_node_changing_color, seed,
+                   num_palette_colors=12, max_iterations_per_color_list=500, sweep_mode="all_nodes"):
+    start_time = time.perf_counter()
+
+    # The probabilities enter the spawn key as the exact bits of their float64 values
+    configuration_key = [num_nodes] + [int(np.float64(prob).view(np.uint64)) for prob in
+                                       (prob_of_creating_edge_between_two_nodes, prob_of_node_changing_color)]
+    graph_seed, agents_seed = np.random.SeedSequence(seed, spawn_key=configuration_key).spawn(2)
+    agents_rng = np.random.default_rng(agents_seed)
+
+    adj_matrix = create_random_simple_graph_numpy(num_nodes, prob_of_creating_edge_between_two_nodes,
+                                                  seed=np.random.default_rng(graph_seed), output="csr")
+    # The "vectorized" sweep mode reads the CSRGraph directly and doesn't need an index
+    neighbour_index = NeighbourIndex(adj_matrix) if sweep_mode != "vectorized" else None
+
+    fewest_colors = None
+    total_iterations = 0
+
+    for num_colors_to_include in range(num_palette_colors, 2, -1):
+        colors = rand_initialise_colors(adj_matrix, list(range(num_colors_to_include)), agents_rng)
+        conflicts, iterations = run_node_agents(adj_matrix, neighbour_index, colors, num_colors_to_include,
+                                                prob_of_node_changing_color, max_iterations_per_color_list,
+                                                sweep_mode, rng=agents_rng)
+        total_iterations += iterations
+
+        if conflicts != 0:
+            break
+
+        fewest_colors = len(set(colors))
+
+    return {
+        "num_nodes": num_nodes,
+        "prob_of_creating_edge_between_two_nodes": prob_of_creating_edge_between_two_nodes,
+        "prob_of_node_changing_color": prob_of_node_changing_color,
+        "seed": seed,
+        "num_edges": adj_matrix.num_edges,
+        "fewest_colors": fewest_colors,
+        "total_iterations": total_iterations,
+        "seconds": time.perf_counter() - start_time,
+    }
+
+
+# Unpacks one grid point for ProcessPoolExecutor.map
+def run_experiment_from_args(args):
+    grid_point, kwargs = args
+    return run_experiment(*grid_point, **kwargs)
+
+
+# Runs run_experiment for every combination of the given values across a pool of max_workers processes
+# (defaults to one per CPU). Any other keyword arguments are passed on to run_experiment.
+# Yields the result dicts in grid order as they become available
+def run_experiment_grid(num_nodes_values, prob_of_creating_edge_values, prob_of_node_changing_color_values, seeds,
+                        max_workers=None, **kwargs):
+    grid = itertools.product(num_nodes_values, prob_of_creating_edge_values, prob_of_node_changing_color_values,
+                             seeds)
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        yield from executor.map(run_experiment_from_args, ((grid_point, kwargs) for grid_point in grid))
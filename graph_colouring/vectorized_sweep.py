@@ -0,0 +1,106 @@
+import numpy as np
+
+from graph_colouring.color_histogram import ColorHistogram
+from graph_colouring.csr_graph import CSRGraph
+from graph_colouring.random_source import as_numpy_generator
+
+
+# Synchronous alternative to sweep_node_agents that applies the same decision rule to every node agent at
+# once with NumPy array operations over the CSRGraph's edge arrays:
+# - a node is in conflict if any neighbour shares its color
+# - a node in conflict changes color with probability prob_of_node_changing_color
+# - it changes to the lowest color index not used by any neighbour, if one is available
+# Unlike sweep_node_agents, every node decides based on the coloring at the start of the sweep, so two
+# neighbouring nodes can both move to the same color in one sweep.
+# Also keeps the number of conflicts in the conflicts attribute and a ColorHistogram of the coloring in the
+# color_histogram attribute, so it can be used in place of a ConflictTracker.
+class VectorizedSweepEngine:
+    # Forbidden colors are held as a bitmask in one uint64 per node
+    max_colors = 63
+
+    # colors may be a NumPy array or a compact color array (see make_color_array). A compact
+    # color array is wrapped without copying, so changes made by the engine are visible through it.
+    # rng may be a seed, a numpy Generator, a random.Random or a RandomSource
+    def __init__(self, graph, colors, rng=None):
+        if not isinstance(graph, CSRGraph):
+            raise TypeError("VectorizedSweepEngine requires the graph to be a CSRGraph")
+
+        self.graph = graph
+        self.colors = colors if isinstance(colors, np.ndarray) else np.frombuffer(colors, dtype=np.uint8)
+        self.rng = as_numpy_generator(rng)
+
+        self.indptr = None
+        self.refresh_if_graph_changed()
+
+        self.conflicts = self.count_conflicts()
+        self.color_histogram = ColorHistogram(self.colors)
+
+    # Rebuilds the cached per-edge arrays if the graph's CSR arrays have been replaced (e.g., by flip_edges)
+    def refresh_if_graph_changed(self):
+        if self.indptr is self.graph.indptr:
+            return
+
+        self.indptr = self.graph.indptr
+        degrees = np.diff(self.indptr)
+
+        # rows[i] is the node whose neighbour list holds indices[i]
+        self.rows = np.repeat(np.arange(len(self.graph)), degrees)
+        self.nonempty_rows = np.flatnonzero(degrees)
+
+    def count_conflicts(self):
+        self.refresh_if_graph_changed()
+
+        # Every edge appears twice in a CSRGraph
+        return int(np.count_nonzero(self.colors[self.graph.indices] == self.colors[self.rows])) // 2
+
+    # Runs one synchronous sweep over all node agents. num_colors_available is the number of colors
+    # (from the start of the palette) the agents may use. Returns the array of nodes that changed color
+    def sweep(self, num_colors_available, prob_of_node_changing_color):
+        if num_colors_available > self.max_colors:
+            raise ValueError(f"VectorizedSweepEngine supports at most {self.max_colors} colors")
+
+        self.refresh_if_graph_changed()
+        num_nodes = len(self.graph)
+        colors = self.colors
+
+        neighbour_colors = colors[self.graph.indices]
+
+        in_conflict = np.zeros(num_nodes, dtype=bool)
+        in_conflict[self.rows[neighbour_colors == colors[self.rows]]] = True
+
+        # OR together the bits of every neighbour's color, one row (node) at a time
+        forbidden_color_masks = np.zeros(num_nodes, dtype=np.uint64)
+        if len(self.nonempty_rows) > 0:
+            neighbour_color_bits = np.left_shift(np.uint64(1), neighbour_colors.astype(np.uint64))
+            forbidden_color_masks[self.nonempty_rows] = np.bitwise_or.reduceat(neighbour_color_bits,
+                                                                               self.indptr[self.nonempty_rows])
+
+        # The lowest zero bit of each mask is that node's first free color. It is a power of
+        # two, so its log2 (exact in floating point) is the color index
+        first_free_color_bits = ~forbidden_color_masks & (forbidden_color_masks + np.uint64(1))
+        first_free_colors = np.log2(first_free_color_bits.astype(np.float64)).astype(np.int64)
+
+        changing = (in_conflict & (self.rng.random(num_nodes) < prob_of_node_changing_color)
+                    & (first_free_colors < num_colors_available))
+
+        self.color_histogram.colors_changed(colors[changing], first_free_colors[changing])
+        colors[changing] = first_free_colors[changing]
+        self.conflicts = self.count_conflicts()
+
+        return np.flatnonzero(changing)
+
+    # Assigns a new color to a single node, adjusting the conflict count from its neighbours only
+    def set_node_color(self, node, color):
+        neighbour_colors = self.colors[self.graph.neighbours(node)]
+        old_color = self.colors[node]
+
+        self.conflicts += int(np.count_nonzero(neighbour_colors == color)
+                              - np.count_nonzero(neighbour_colors == old_color))
+        self.colors[node] = color
+        self.color_histogram.node_color_changed(node, old_color, color)
+
+    # Adjusts the conflict count after the edge between node_1 and node_2 has been
+    # added (edge_added is True) or removed (edge_added is False) from the graph
+    def edge_flipped(self, node_1, node_2, edge_added):
+        if self.colors[node_1] == self.colors[node_2]:
+            self.conflicts += 1 if edge_added else -1
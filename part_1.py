@@ -1,176 +1,214 @@
-import matplotlib.pyplot as plt
-import networkx as nx
-import numpy as np
 import random
 
+from graph_colouring.agents import get_nodes_to_visit, sweep_node_agents
+from graph_colouring.bitset_graph import BitsetGraph
+from graph_colouring.color_masks import ForbiddenColorMasks
+from graph_colouring.conflict_tracker import ConflictTracker
+from graph_colouring.csr_graph import CSRGraph
+from graph_colouring.graph import (create_random_simple_graph, get_color_conflicts, rand_initialise_colors,
+                                    warm_start_colors)
+from graph_colouring.generators import create_random_simple_graph_numpy
+from graph_colouring.loaders import load_graph
+from graph_colouring.neighbour_index import NeighbourIndex
+from graph_colouring.palette import Palette, make_color_array
+from graph_colouring.palette_search import bisect_palette_size, race_palette_sizes
+from graph_colouring.progress import ProgressReporter
+from graph_colouring.vectorized_sweep import VectorizedSweepEngine
+
+
+# Runs the experiment: colors a random graph, printing progress and plotting the results
+def main():
+    # Imported here rather than at module level so that importing this module doesn't pull in plotting libraries
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    import numpy as np
+
+    # List of all available colors that nodes will choose from. Numebr of colors
+    # provided from this list will be constrained as iterations progress further
+    all_available_colors = ["cyan", "magenta", "red", "green", "blue", "yellow", "purple", "lime", "orange", "maroon",
+                            "lightsteelblue", "navy"]
+
+    # Node agents work with color indices (color i is all_available_colors[i]). They are only
+    # mapped back to color names when the graph is drawn
+    palette = Palette(all_available_colors)
+    num_nodes = 10
+    prob_of_creating_edge_between_two_nodes = 0.4
+
+    # Seed of the random number generator that the whole run draws from (None for a different run every time)
+    seed = None
+    rng = random.Random(seed)
+
+    # Store the graph in compressed sparse row form (O(nodes + edges) memory) instead of as a full adjacency matrix
+    use_sparse_graph = False
+
+    # Store the graph as a bit-packed upper triangle (one bit per pair of nodes) instead of as a full adjacency
+    # matrix, for dense graphs. Ignored if use_sparse_graph
+    use_bitset_graph = False
+
+    # Generate the graph with the vectorized NumPy generator instead of create_random_simple_graph
+    use_numpy_graph_generator = False
+
+    # Edge sampling method for the NumPy generator: "all_pairs" or "geometric_skip" (O(nodes + edges), for sparse
+    # graphs)
+    numpy_graph_sampling_method = "all_pairs"
+
+    # Color the graph in this DIMACS .col or edge list file instead of a random graph (num_nodes and
+    # prob_of_creating_edge_between_two_nodes are then ignored). It is loaded as a CSRGraph, cached next to the file
+    graph_file_path = None
+
+    if graph_file_path is not None:
+        adj_matrix = load_graph(graph_file_path)
+    elif use_numpy_graph_generator:
+        adj_matrix = create_random_simple_graph_numpy(num_nodes, prob_of_creating_edge_between_two_nodes,
+                                                      output="csr" if use_sparse_graph
+                                                      else "bitset" if use_bitset_graph else "dense",
+                                                      seed=rng, method=numpy_graph_sampling_method)
+    else:
+        adj_matrix = create_random_simple_graph(num_nodes, prob_of_creating_edge_between_two_nodes, rng)
 
-# Creates the adjacency matrix of a random simple graph and returns it
-# (based on Erdos-Renyi random graph model)
-def create_random_simple_graph(num_nodes, prob_of_creating_edge_between_two_nodes):
-    # This will be a square matrix.
-    # It is adjacency matrix of a simple graph (no self-edges and
-    # # no more than one edge between any pair of vertices)
-    adj_matrix = []
+        if use_sparse_graph:
+            adj_matrix = CSRGraph.from_adj_matrix(adj_matrix)
+        elif use_bitset_graph:
+            adj_matrix = BitsetGraph.from_adj_matrix(adj_matrix)
 
-    for x in range(num_nodes):
-        row = []
+    # Create networkx graph object
+    if isinstance(adj_matrix, (CSRGraph, BitsetGraph)):
+        G = nx.from_numpy_array(np.array(adj_matrix.to_adj_matrix()))
+    else:
+        G = nx.from_numpy_array(np.array(adj_matrix))
+
+    prob_of_node_changing_color = 0.4
+
+    # How each iteration loops over the node agents: "all_nodes", "conflicted_nodes" (only nodes currently in
+    # conflict) or "vectorized" (all nodes decide at once with NumPy, needs use_sparse_graph)
+    sweep_mode = "all_nodes"
+
+    # Used below for recording best achieved coloring for reporting once termination occurs
+    best_achieved_coloring = None
+
+    # When the number of available colors is reduced, start from the last valid coloring and only recolor the
+    # nodes that used the removed color, instead of starting again from a random coloring
+    warm_start_color_reduction = False
+
+    max_iterations_per_color_list = 500
+
+    # Print progress every progress_interval_in_iterations iterations (and at most once every
+    # progress_min_seconds_between_reports seconds), or nothing at all if quiet_progress. If progress_json_lines_path
+    # is set, progress is also written to that file as JSON lines
+    progress_interval_in_iterations = 50
+    progress_min_seconds_between_reports = 0.0
+    quiet_progress = False
+    progress_json_lines_path = None
+    progress_reporter = ProgressReporter(progress_interval_in_iterations, progress_min_seconds_between_reports,
+                                         quiet_progress, progress_json_lines_path)
+
+    # How the number of available colors is searched:
+    # - "linear": try one color list after another, from all colors down, until the agents fail
+    # - "parallel_race": try every color list size at once (seeds_per_palette_size times each) in a process pool
+    # - "bisect": binary search between a greedy clique size (lower bound) and a greedy coloring (upper bound),
+    #   trying each color list size up to seeds_per_palette_size times
+    palette_search_strategy = "linear"
+    seeds_per_palette_size = 4
+
+    # Build the neighbour lists of every node once rather than rescanning adjacency matrix rows every iteration.
+    # The parallel race's workers build their own, and the "vectorized" sweep mode reads the CSRGraph directly, so
+    # then they are only needed for warm starts and the bisect strategy's greedy bounds
+    if palette_search_strategy == "bisect" or (palette_search_strategy != "parallel_race"
+                                               and (sweep_mode != "vectorized" or warm_start_color_reduction)):
+        neighbour_index = NeighbourIndex(adj_matrix)
+    else:
+        neighbour_index = None
+
+    if palette_search_strategy == "parallel_race":
+        palette_sizes = range(len(all_available_colors), 2, -1)
+        num_colors, best_achieved_coloring = race_palette_sizes(adj_matrix, palette_sizes, seeds_per_palette_size,
+                                                                prob_of_node_changing_color,
+                                                                max_iterations_per_color_list, base_seed=seed,
+                                                                sweep_mode=sweep_mode)
+        print(f"Parallel race: fewest available colors with a perfect graph coloring: {num_colors}\n")
+    elif palette_search_strategy == "bisect":
+        bisect_result = bisect_palette_size(adj_matrix, neighbour_index, len(all_available_colors),
+                                            prob_of_node_changing_color, max_iterations_per_color_list,
+                                            seeds_per_palette_size, sweep_mode, rng)
+        num_colors, best_achieved_coloring, lower_bound, num_greedy_colors = bisect_result
+        print(f"Bisect: fewest available colors with a perfect graph coloring: {num_colors} (lower bound: "
+              f"{lower_bound}, greedy coloring: {num_greedy_colors} colors)\n")
+    else:
+        for num_colors_to_include in range(len(all_available_colors), 2, -1):
+            # Iteratively decrease the number of distinct colors that the agents can use for coloring
+            curr_colors_list = palette.get_color_indices(num_colors_to_include)
 
-        # Fill in one half of matrix (including diagonals which are set to 0)
-        for y in range(x + 1):
-            if x == y:
-                row.append(0)
+            if warm_start_color_reduction and best_achieved_coloring is not None:
+                initial_random_colors = warm_start_colors(best_achieved_coloring, curr_colors_list, neighbour_index,
+                                                          rng)
             else:
-                row.append(1 if random.random() < prob_of_creating_edge_between_two_nodes else 0)
+                initial_random_colors = rand_initialise_colors(adj_matrix, curr_colors_list, rng)
 
-        adj_matrix.append(row)
+            # Create copy of the initial random coloring - this will
+            # be updated as agents change their colors during the iterations
+            colors = make_color_array(initial_random_colors)
 
-    # We have constructed half of the adjacency matrix as well as the diagonal
-    # values (all 0). We will now fill in the other half of the adjacency matrix
-    # and maintain matrix symmetry (this is a simple graph).
-    for x in range(num_nodes):
-        # For every row, iterate from one element beneath its diagonal element
-        # (x + 1) down to the bottom of the respective column (num_nodes - 1)
-        total_app = 0
-        len_before_app = len(adj_matrix[x])
-        for y in range(x + 1, num_nodes):
-            # Append all the column values to the current row
-            # down from the diagonal value (maintain matrix symmetry)
-            # adj_matrix[y][x]: Fix the column with [x], move down the column rows as [y] is incremented
-            total_app += 1
-            adj_matrix[x].append(adj_matrix[y][x])
-
-    return adj_matrix
-
-
-# Returns a list of neighbours of a given node.
-# Note that nodes are identified by their zero-based index e.g., for 30 nodes, node 'IDs' are 0-29
-def get_node_neighbours(node, adj_matrix):
-    node_row = adj_matrix[node]
-    neighbours = [n for n in range(len(node_row)) if node_row[n] == 1]
-
-    return neighbours
-
-
-# Given a list of available colors, randomly assign
-# colors to nodes. Returns an ordered list of colors
-# corresponding to the ordering of node rows in the adjacency matrix
-def rand_initialise_colors(adj_matrix, colors_list):
-    colors = []
-
-    for node in range(len(adj_matrix)):
-        # Randomly assign a color from the list to a node
-        color_index = random.randint(0, len(colors_list) - 1)
-        colors.append(colors_list[color_index])
-
-    return colors
-
-
-# Returns the color currently associated with a particular node
-def get_node_color(node, colors):
-    return colors[node]
-
-
-# Returns the total number of color conflicts in the graph
-# specified by adj_matrix and its current coloring
-def get_color_conflicts(adj_matrix, colors):
-    conflicts = 0
-
-    for node_1 in range(len(adj_matrix)):
-        # We only want to iterate through the row up to but not including the diagonal
-        # i.e., iterate through one half of the adjacency matrix so as not to double-count conflicts
-        # e.g. if node 1 <--> node 5 and they have the same color, we want to count that conflict
-        # once and not again for node 5 <--> node 1
-        for node_2 in range(node_1):
-            # If two nodes are adjacent, check if there is a color
-            # conflict between them
-            if adj_matrix[node_1][node_2] == 1:
-                if get_node_color(node_1, colors) == get_node_color(node_2, colors):
-                    conflicts += 1
-
-    return conflicts
-
-
-# List of all available colors that nodes will choose from. Numebr of colors
-# provided from this list will be constrained as iterations progress further
-all_available_colors = ["cyan", "magenta", "red", "green", "blue", "yellow", "purple", "lime", "orange", "maroon",
-                        "lightsteelblue", "navy"]
-num_nodes = 10
-prob_of_creating_edge_between_two_nodes = 0.4
-
-adj_matrix = create_random_simple_graph(num_nodes, prob_of_creating_edge_between_two_nodes)
-
-# Create networkx graph object
-G = nx.from_numpy_array(np.array(adj_matrix))
-
-prob_of_node_changing_color = 0.4
-
-# Used below for recording best achieved coloring for reporting once termination occurs
-best_achieved_coloring = None
-
-max_iterations_per_color_list = 500
-
-for num_colors_to_include in range(len(all_available_colors), 2, -1):
-    # Iteratively decrease the number of distinct colors that the agents can use for coloring
-    curr_colors_list = all_available_colors[:num_colors_to_include]
-
-    initial_random_colors = rand_initialise_colors(adj_matrix, curr_colors_list)
-    initial_conflicts = get_color_conflicts(adj_matrix, initial_random_colors)
-
-    # Create copy of the initial random coloring - this will
-    # be updated as agents change their colors during the iterations
-    colors = initial_random_colors.copy()
-
-    # While there are still color conflicts in the graph
-    print(f"{len(curr_colors_list)} available colors: Starting to loop through node agents")
-    iteration = 0
-    # Try to achieve zero conflicts.
-    while get_color_conflicts(adj_matrix, colors) != 0 and iteration < max_iterations_per_color_list:
-        iteration += 1
-        print(f"Iteration: {iteration}, Initial conflicts: {initial_conflicts}, Current conflicts: "
-              f"{get_color_conflicts(adj_matrix, colors)}, Number of colors being used: {len(set(colors))}")
-        # If it conflicts with its neighbours' colorings, node will autonomously
-        # decide if it will change color and, if so, which color it will pick
-        for node in range(len(adj_matrix)):
-            neighbours = get_node_neighbours(node, adj_matrix)
-            # Use set() to remove duplicates if multiple neighbours have the same color
-            unique_colors_of_neighbours = set([get_node_color(neighbour, colors) for neighbour in neighbours])
-
-            # If the current node shares a color with any neighbour, it is in conflict
-            if get_node_color(node, colors) in unique_colors_of_neighbours:
-                # If true, node will decide to change its color such that it is
-                # different from all its neighbours
-                if random.random() < prob_of_node_changing_color:
-                    # Node must choose a color from the list of available colors
-                    # that is not within unique_colors_of_neighbours.
-                    # It will attempt to choose colors closer to the start of
-                    # colors_list. This decision strategy should constrain the
-                    # total number of distinct colors used in the graph
-                    old_color = colors[node]
-                    for color in curr_colors_list:
-                        if color not in unique_colors_of_neighbours:
-                            # Node assigns itself the new color to resolve conflicts with neighbours
-                            colors[node] = color
-                            break
-
-                    # The node could still have its old color here if it ran out of new colors to choose
-                    # from in colors_list i.e., there were no more distinct colors left to switch
-                    # to in order to resolve conflicts with neighbours. In this case, the node will simply retain its
-                    # current color for this iteration.
-    if get_color_conflicts(adj_matrix, colors) == 0:
-        print(f"{len(curr_colors_list)} available colors: Agents achieved perfect graph coloring using "
-              f"{len(set(colors))} colors.\n")
-        best_achieved_coloring = colors
-
-        plt.title(f"Solution achieved when {len(curr_colors_list)} colors available. Used {len(set(colors))} colors, "
-                  f"Conflicts: {get_color_conflicts(adj_matrix, colors)}")
-        nx.draw(G, node_color=colors, with_labels=True)
-        plt.show()
-    else:
-        print(f"{len(curr_colors_list)} available colors: Agents failed to achieve perfect graph coloring.\n")
-        break
-
-# Draw graph of best achieved result
-plt.title(f"Best result achieved. Used {len(set(best_achieved_coloring))} colors, Conflicts: "
-          f"{get_color_conflicts(adj_matrix, best_achieved_coloring)}")
-nx.draw(G, node_color=best_achieved_coloring, with_labels=True)
-plt.show()
+            # Count conflicts once and keep the count up to date as agents change their colors
+            if sweep_mode == "vectorized":
+                # The vectorized engine recounts conflicts itself after every sweep
+                conflict_tracker = VectorizedSweepEngine(adj_matrix, colors, rng)
+            else:
+                # Also keep, for every node, a bitmask of the colors used by its neighbours
+                forbidden_color_masks = ForbiddenColorMasks(neighbour_index, colors, len(palette))
+                conflict_tracker = ConflictTracker(neighbour_index, colors, forbidden_color_masks)
+            initial_conflicts = conflict_tracker.conflicts
+            # Number of nodes of each color, kept up to date by the conflict tracker
+            color_histogram = conflict_tracker.color_histogram
+
+            # While there are still color conflicts in the graph
+            progress_reporter.report_event("start_color_list", f"{len(curr_colors_list)} available colors: Starting to "
+                                           f"loop through node agents", num_colors_available=len(curr_colors_list))
+            iteration = 0
+            # Try to achieve zero conflicts.
+            while conflict_tracker.conflicts != 0 and iteration < max_iterations_per_color_list:
+                iteration += 1
+                if progress_reporter.is_due(iteration):
+                    progress_reporter.report_iteration(iteration, initial_conflicts=initial_conflicts,
+                                                       current_conflicts=conflict_tracker.conflicts,
+                                                       number_of_colors_being_used=color_histogram.num_colors_used)
+                # Loop over the node agents. Each node in conflict may decide to change its color
+                if sweep_mode == "vectorized":
+                    conflict_tracker.sweep(len(curr_colors_list), prob_of_node_changing_color)
+                else:
+                    nodes_to_visit = get_nodes_to_visit(sweep_mode, len(adj_matrix), forbidden_color_masks)
+                    sweep_node_agents(nodes_to_visit, forbidden_color_masks, conflict_tracker, len(curr_colors_list),
+                                      prob_of_node_changing_color, rng)
+            if conflict_tracker.conflicts == 0:
+                progress_reporter.report_event("color_list_succeeded", f"{len(curr_colors_list)} available colors: "
+                                               f"Agents achieved perfect graph coloring using "
+                                               f"{color_histogram.num_colors_used} colors.\n",
+                                               num_colors_available=len(curr_colors_list),
+                                               num_colors_used=color_histogram.num_colors_used, iterations=iteration)
+                best_achieved_coloring = colors
+
+                plt.title(f"Solution achieved when {len(curr_colors_list)} colors available. Used "
+                          f"{color_histogram.num_colors_used} colors, Conflicts: {conflict_tracker.conflicts}")
+                nx.draw(G, node_color=palette.to_names(colors), with_labels=True)
+                plt.show()
+            else:
+                progress_reporter.report_event("color_list_failed", f"{len(curr_colors_list)} available colors: Agents "
+                                               f"failed to achieve perfect graph coloring.\n",
+                                               num_colors_available=len(curr_colors_list),
+                                               conflicts=conflict_tracker.conflicts, iterations=iteration)
+                break
+
+    progress_reporter.close()
+
+    if best_achieved_coloring is None:
+        print("Agents did not achieve a perfect graph coloring with any number of available colors")
+        return
+
+    # Draw graph of best achieved result
+    plt.title(f"Best result achieved. Used {len(set(best_achieved_coloring))} colors, Conflicts: "
+              f"{get_color_conflicts(adj_matrix, best_achieved_coloring)}")
+    nx.draw(G, node_color=palette.to_names(best_achieved_coloring), with_labels=True)
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
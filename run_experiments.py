@@ -0,0 +1,27 @@
+import argparse
+import json
+
+from graph_colouring.agents import sweep_modes
+from graph_colouring.runner import run_experiment_grid
+
+
+# Runs the Part 1 experiment over a grid of parameters and seeds across worker processes, printing one JSON
+# line per run
+def main():
+    parser = argparse.ArgumentParser(description="Run the graph colouring experiment over a grid of parameters")
+    parser.add_argument("--num-nodes", type=int, nargs="+", default=[100])
+    parser.add_argument("--prob-edge", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--prob-change-color", type=float, nargs="+", default=[0.4])
+    parser.add_argument("--seeds", type=int, default=10, help="number of seeds (0 to seeds - 1) per configuration")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sweep-mode", default="all_nodes", choices=sweep_modes + ("vectorized",))
+    args = parser.parse_args()
+
+    results = run_experiment_grid(args.num_nodes, args.prob_edge, args.prob_change_color, range(args.seeds),
+                                  max_workers=args.workers, sweep_mode=args.sweep_mode)
+    for result in results:
+        print(json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()